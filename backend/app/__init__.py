@@ -1,28 +1,53 @@
+import click
 from flask import Flask, jsonify
+from flask.cli import ScriptInfo
 from .config import config
-from .extensions import db, jwt, migrate, CORS, bcrypt
+from .extensions import db, jwt, CORS, bcrypt, limiter
 
 def create_app(config_name='production'):
-    """Factory function to create the application instance."""
+    """Factory function to create the application instance.
+
+    Safe to call once in a gunicorn --preload master: nothing here opens a
+    database connection, log file or thread, so forked workers share the
+    imported code and start with clean pools (see gunicorn.conf.py).
+    """
     app = Flask(__name__)
     
     # 1. Load Configuration
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
+    if app.config.get('PROXY_HOPS'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_HOPS'])
     
     # 2. Register Extensions (like SQLAlchemy, JWT)
     db.init_app(app)
+    from .engine import init_engine
+    from .replicas import init_replicas, STICKY_HEADER
+    init_engine(app)
+    init_replicas(app)
     jwt.init_app(app)
-    migrate.init_app(app, db)
-    CORS(app, resources={r"/*": {"origins": "*"}})
+    CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=[STICKY_HEADER])
     bcrypt.init_app(app)
+    limiter.init_app(app)
+    from .security import hasher
+    hasher.init_app(app)
 
     # 3. Register Blueprints
     from .routes import blueprints
     for bp in blueprints:
         app.register_blueprint(bp)
+    # Session hooks that keep the per-worker read caches in step with commits
+    from . import caches
+
+    # 4. CLI Commands (Flask-Migrate pulls in alembic, so only under the `flask` CLI).
+    # Other click-based launchers (uvicorn, gunicorn's CLI) have a click context
+    # too; only Flask's carries a ScriptInfo.
+    ctx = click.get_current_context(silent=True)
+    if ctx is not None and ctx.find_object(ScriptInfo) is not None:
+        register_cli(app)
     
-    # 4. Global Error Handlers (optional, but recommended)
+    # 5. Global Error Handlers (optional, but recommended)
     @app.errorhandler(404)
     def not_found(error):
         return jsonify({
@@ -31,4 +56,30 @@ def create_app(config_name='production'):
             "message": "The requested URL was not found on the server."
         }), 404
 
-    return app
\ No newline at end of file
+    return app
+
+def warm_caches(app):
+    """Fill the per-worker read caches so the first requests after a deploy don't
+    pay for them. Called once per worker after fork (gunicorn.conf.py, asgi.py);
+    failures only mean the caches fill lazily on first use.
+    """
+    from .catalogue import catalogue
+    from .progress import wish_progress
+    with app.app_context():
+        try:
+            wish_progress.load()
+            catalogue.get(app.config.get('CATALOGUE_MAX_AGE', 30))
+        except Exception as e:
+            app.logger.warning(f'Cache warm-up skipped: {e}')
+        finally:
+            db.session.remove()
+
+def register_cli(app):
+    from flask_migrate import Migrate
+    from .reconcile import reconcile_payments
+    from .security import create_admin
+    from .archive import archive_payments
+    Migrate(app, db)
+    app.cli.add_command(reconcile_payments)
+    app.cli.add_command(create_admin)
+    app.cli.add_command(archive_payments)
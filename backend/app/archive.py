@@ -0,0 +1,140 @@
+import gzip
+import json
+import os
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert, literal, select, union_all
+
+from .extensions import db
+from .models import Payments, PaymentsArchive
+
+ARCHIVE_COLUMNS = ('id', 'payment_date', 'wish_id', 'quantity', 'unit_price', 'amount', 'donor_email', 'reference')
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def next_month(value):
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def archive_boundary():
+    """Newest archived payment date, or None when nothing has been archived.
+
+    Reads the upper end of the payment_date index, so it is a cheap lookup.
+    """
+    return db.session.query(func.max(PaymentsArchive.payment_date)).scalar()
+
+
+def payments_select(start=None, end=None, donor_email=None, include_archive=None):
+    """A SELECT over the payments in [start, end), reading the archive only when
+    the range reaches back into archived months.
+
+    A range with no lower bound (only `end`) reaches the oldest payments, so it
+    reads the archive too; with neither bound only the hot table is read unless
+    `include_archive` is True. True/False force the archive in or out.
+    Rows carry an `archived` flag; callers add ordering, joins and paging.
+    """
+    def ranged(model, archived):
+        columns = [getattr(model, c).label(c) for c in ARCHIVE_COLUMNS]
+        query = select(*columns, literal(archived).label('archived'))
+        if start is not None:
+            query = query.where(model.payment_date >= start)
+        if end is not None:
+            query = query.where(model.payment_date < end)
+        if donor_email is not None:
+            query = query.where(model.donor_email == donor_email)
+        return query
+
+    hot = ranged(Payments, False)
+    if include_archive is None:
+        if start is None and end is None:
+            include_archive = False
+        else:
+            boundary = archive_boundary()
+            include_archive = boundary is not None and (start is None or start <= boundary)
+    if not include_archive:
+        return hot
+    return union_all(hot, ranged(PaymentsArchive, True))
+
+
+def _ensure_partition(period_start):
+    """Create the month's partition of payments_archive on PostgreSQL."""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    name = f"payments_archive_y{period_start.year}m{period_start.month:02d}"
+    db.session.execute(db.text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF payments_archive "
+        f"FOR VALUES FROM ('{period_start.isoformat()}') TO ('{next_month(period_start).isoformat()}')"
+    ))
+
+
+def _export_month(path, period_start, period_end, chunk_size):
+    """Stream one month of hot payments into a gzip NDJSON file."""
+    rows = db.session.query(*[getattr(Payments, c) for c in ARCHIVE_COLUMNS]) \
+        .filter(Payments.payment_date >= period_start, Payments.payment_date < period_end) \
+        .order_by(Payments.payment_date, Payments.id) \
+        .yield_per(chunk_size)
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for row in rows:
+            record = dict(zip(ARCHIVE_COLUMNS, row))
+            record['payment_date'] = record['payment_date'].isoformat()
+            f.write(json.dumps(record) + '\n')
+            count += 1
+    return count
+
+
+@click.command('archive-payments')
+@click.option('--before', type=click.DateTime(formats=['%Y-%m']), default=None,
+              help='Archive every month before this one (default: keep PAYMENTS_HOT_MONTHS hot).')
+@click.option('--export-dir', type=click.Path(file_okay=False), default=None,
+              help='Also write each archived month to <dir>/payments-YYYY-MM.ndjson.gz.')
+@click.option('--chunk-size', default=1000, show_default=True)
+@click.option('--dry-run', is_flag=True, help='Only report what would be archived.')
+@with_appcontext
+def archive_payments(before, export_dir, chunk_size, dry_run):
+    """Move payments from closed months out of the hot payments table."""
+    cutoff = month_start(before) if before else \
+        add_months(month_start(datetime.utcnow()), -current_app.config.get('PAYMENTS_HOT_MONTHS', 6))
+
+    oldest = db.session.query(func.min(Payments.payment_date)).scalar()
+    if oldest is None or oldest >= cutoff:
+        click.echo(f"Nothing to archive before {cutoff:%Y-%m}")
+        return
+    if export_dir:
+        os.makedirs(export_dir, exist_ok=True)
+
+    period_start = month_start(oldest)
+    while period_start < cutoff:
+        period_end = next_month(period_start)
+        in_period = (Payments.payment_date >= period_start, Payments.payment_date < period_end)
+        count = db.session.query(func.count(Payments.id)).filter(*in_period).scalar()
+        if count and dry_run:
+            click.echo(f"{period_start:%Y-%m}: {count} payments would be archived")
+        elif count:
+            try:
+                if export_dir:
+                    path = os.path.join(export_dir, f"payments-{period_start:%Y-%m}.ndjson.gz")
+                    _export_month(path, period_start, period_end, chunk_size)
+                _ensure_partition(period_start)
+                # Copy and delete in one transaction so a month is never half moved
+                columns = [getattr(Payments, c) for c in ARCHIVE_COLUMNS]
+                db.session.execute(insert(PaymentsArchive).from_select(
+                    list(ARCHIVE_COLUMNS), select(*columns).where(*in_period)))
+                db.session.query(Payments).filter(*in_period).delete(synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            click.echo(f"{period_start:%Y-%m}: archived {count} payments")
+        period_start = period_end
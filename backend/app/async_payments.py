@@ -0,0 +1,238 @@
+"""Async versions of the gateway-bound payments routes for the ASGI entry point (asgi.py).
+
+The handlers mirror initialize_payments and payment_callback in routes/payments.py but
+await the gateway with httpx and the database with SQLAlchemy's asyncio engine, so one
+worker process can hold many in-flight gateway calls. Every other path is passed
+through to the regular Flask app.
+"""
+import json
+from urllib.parse import parse_qs
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from .catalogue import catalogue
+from .extensions import db, limiter
+from .models import Payments, PaymentReferences, Wishes
+from .paystack import (PAYSTACK_INIT_URL, PAYSTACK_VERIFY_URL, PAYSTACK_CALLBACK_URL,
+                       auth_headers, parse_transaction)
+from .progress import wish_progress
+from .ratelimit import forwarded_for
+from .replicas import client_key, note_write
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+}
+
+
+def async_database_url(url):
+    """Swap the sync driver in a SQLAlchemy URL for its asyncio counterpart."""
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+async def _read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def _respond(send, status, body, content_type='application/json'):
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode() if content_type == 'application/json' else body.encode()
+    await send({'type': 'http.response.start', 'status': status, 'headers': [
+        (b'content-type', content_type.encode()),
+        (b'content-length', str(len(body)).encode()),
+        # Same policy Flask-CORS applies to the rest of the API
+        (b'access-control-allow-origin', b'*'),
+    ]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+class AsyncPayments:
+    """ASGI app serving the payments routes natively and delegating the rest."""
+
+    def __init__(self, flask_app, fallback):
+        self.fallback = fallback
+        with flask_app.app_context():
+            url = async_database_url(db.engine.url)
+        # Sized for the event loop, not the sync worker profile (see async_engine_options)
+        options = dict(flask_app.config.get('ASYNC_ENGINE_OPTIONS') or {})
+        if url.get_backend_name() == 'sqlite':
+            options = {}
+        self.engine = create_async_engine(url, **options)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.client = None
+        # Same limits the Flask view declares through @limiter.limit
+        self.init_limits = flask_app.view_functions['payments.initialize_payments'].rate_limits
+        self.proxy_hops = flask_app.config.get('PROXY_HOPS', 0)
+        self.sticky_seconds = flask_app.config.get('REPLICA_STICKY_SECONDS', 5)
+        self.routes = {
+            ('POST', '/payments/api/initialize-payment'): self.initialize_payment,
+            ('GET', '/payments/payment_callback'): self.payment_callback,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        handler = None
+        if scope['type'] == 'http':
+            handler = self.routes.get((scope['method'], scope['path'].rstrip('/') or '/'))
+        if handler is None:
+            return await self.fallback(scope, receive, send)
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=10)
+
+        started = False
+
+        async def tracked_send(message):
+            nonlocal started
+            if message['type'] == 'http.response.start':
+                started = True
+            await send(message)
+
+        try:
+            await handler(scope, receive, tracked_send)
+        except Exception as e:
+            # Same JSON 500 the sync views return from their catch-all
+            print(f"Unhandled error in {scope['path']}: {e}")
+            if not started:
+                await _respond(send, 500, {"status": False, "message": str(e)})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.client = httpx.AsyncClient(timeout=10)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.client is not None:
+                    await self.client.aclose()
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def client_ip(self, scope):
+        # Same rule ProxyFix applies for the Flask routes
+        if self.proxy_hops:
+            values = [v.decode() for name, v in scope.get('headers', []) if name == b'x-forwarded-for']
+            ip = forwarded_for(','.join(values), self.proxy_hops)
+            if ip:
+                return ip
+        client = scope.get('client')
+        return client[0] if client else 'unknown'
+
+    async def initialize_payment(self, scope, receive, send):
+        retry_after = limiter.check(self.init_limits, 'payments.initialize_payments', self.client_ip(scope))
+        if retry_after:
+            body = json.dumps({'success': False, 'message': 'Too many requests, please try again later'}).encode()
+            await send({'type': 'http.response.start', 'status': 429, 'headers': [
+                (b'content-type', b'application/json'),
+                (b'retry-after', str(retry_after).encode()),
+                (b'access-control-allow-origin', b'*'),
+            ]})
+            return await send({'type': 'http.response.body', 'body': body})
+
+        try:
+            data = json.loads(await _read_body(receive) or b'{}')
+        except ValueError:
+            return await _respond(send, 400, {"status": False, "message": "Invalid JSON body"})
+        if not isinstance(data, dict):
+            return await _respond(send, 400, {"status": False, "message": "Invalid JSON body"})
+
+        try:
+            item_id = int(data.get('id'))
+        except (TypeError, ValueError):
+            return await _respond(send, 400, {"status": False, "message": "Invalid item ID"})
+
+        try:
+            amount_kobo = int(float(data.get('amount')) * 100)
+        except (TypeError, ValueError):
+            return await _respond(send, 400, {"status": False, "message": "Missing details"})
+
+        async with self.sessions() as session:
+            wish = await session.get(Wishes, item_id)
+        if not wish:
+            return await _respond(send, 400, {"status": False, "message": "Invalid item ID"})
+
+        payload = {
+            "email": data.get('email'),
+            "amount": amount_kobo,
+            "callback_url": PAYSTACK_CALLBACK_URL,
+            "metadata": {
+                "item_id": item_id,
+                "quantity": data.get('quantity'),
+                "unit_price": data.get('unit_price'),
+                "custom_notes": "Purchasing specific item"
+            }
+        }
+        try:
+            response = await self.client.post(PAYSTACK_INIT_URL, json=payload, headers=auth_headers())
+            response_data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"Paystack init request failed: {e}")
+            return await _respond(send, 502, {"status": False, "message": f"Payment gateway error: {e}"})
+
+        if response.status_code == 200 and response_data.get('status'):
+            return await _respond(send, 200, {
+                "status": True,
+                "auth_url": response_data['data']['authorization_url'],
+                "reference": response_data['data']['reference']
+            })
+        return await _respond(send, 400, {"status": False, "message": "Init failed"})
+
+    async def payment_callback(self, scope, receive, send):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        reference = (query.get('reference') or [None])[0]
+        if not reference:
+            return await _respond(send, 400, "No reference", 'text/plain')
+
+        try:
+            verify_response = await self.client.get(f"{PAYSTACK_VERIFY_URL}{reference}", headers=auth_headers())
+            verify_data = verify_response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"Paystack verify request failed: {e}")
+            return await _respond(send, 502, "Payment gateway error", 'text/plain')
+
+        if not (verify_data.get('status') and (verify_data.get('data') or {}).get('status') == 'success'):
+            return await _respond(send, 200, "Payment Failed", 'text/plain')
+
+        paid = parse_transaction(verify_data['data'])
+        if paid['item_id'] is None:
+            return await _respond(send, 400, "Missing item_id in payment metadata", 'text/plain')
+
+        async with self.sessions() as session:
+            # A reloaded callback page must not record the same charge twice,
+            # even after its payment was archived
+            existing = await session.get(PaymentReferences, reference)
+            if existing is None:
+                wish = await session.get(Wishes, paid['item_id'])
+                if not wish:
+                    return await _respond(send, 400, f"Invalid item_id: {paid['item_id']}", 'text/plain')
+                try:
+                    await session.run_sync(lambda s: Payments.record(
+                        wish, paid['quantity'], paid['unit_price'], paid['amount'],
+                        paid['email'], reference=reference, session=s))
+                    wish.current_price = (wish.current_price or 0.0) + paid['amount']
+                    if wish.current_price >= wish.total_price:
+                        wish.fulfilled = True
+                    await session.commit()
+                    # This session bypasses the sync session hooks, so update the caches directly
+                    wish_progress.record_donation(wish.id, paid['amount'])
+                    catalogue.invalidate()
+                    note_write(client_key(self.client_ip(scope)), self.sticky_seconds)
+                except Exception as e:
+                    await session.rollback()
+                    if await session.get(PaymentReferences, reference) is None:
+                        print(f"Failed to create payment record: {e}")
+                        return await _respond(send, 500, "Server error creating payment record", 'text/plain')
+                    # Otherwise a concurrent callback for the same charge recorded it first
+
+        return await _respond(send, 200, f"Success! You paid for Item ID: {paid['item_id']}", 'text/plain')
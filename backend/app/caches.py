@@ -0,0 +1,76 @@
+"""Session hooks keeping this worker's read caches in step with its commits.
+
+One set of hooks notes what each transaction touched; after the commit the
+catalogue is marked stale and the wish progress snapshot is patched in place (or
+reloaded, when a bulk statement hides which rows changed). A rollback drops it all.
+"""
+from sqlalchemy import event, inspect
+
+from .catalogue import catalogue
+from .models import Charities, Wishes
+from .progress import wish_progress
+from .replicas import RoutingSession
+
+TRACKED = (Charities, Wishes)
+
+
+class _WishValues:
+    """Plain copy of the wish columns the snapshot keeps (detached from the session)."""
+    __slots__ = ('id', 'name', 'description', 'unit_price', 'quantity', 'total_price',
+                 'current_price', 'fulfilled', 'created_at')
+
+    def __init__(self, wish):
+        for name in self.__slots__:
+            setattr(self, name, getattr(wish, name))
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _capture_changes(session, flush_context):
+    # Values are read here, while the objects are still loaded; they are only
+    # applied once the transaction commits
+    changes = session.info.setdefault('cache_changes', [])
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, TRACKED):
+            session.info['cache_touched'] = True
+        if isinstance(obj, Wishes):
+            # A wish created with only charity_id set has no charity loaded yet
+            with session.no_autoflush:
+                charity = obj.charity or (session.get(Charities, obj.charity_id) if obj.charity_id else None)
+            changes.append(('wish', (_WishValues(obj), charity.name if charity else None)))
+        elif isinstance(obj, Charities):
+            history = inspect(obj).attrs.name.history
+            if history.deleted and history.added:
+                changes.append(('charity', (obj.id, history.deleted[0], history.added[0])))
+    for obj in session.deleted:
+        if isinstance(obj, TRACKED):
+            session.info['cache_touched'] = True
+        if isinstance(obj, Wishes):
+            changes.append(('delete', obj.id))
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _capture_bulk_changes(orm_execute_state):
+    # Bulk UPDATE/DELETE don't say which rows they hit; reload after commit
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and \
+            orm_execute_state.bind_mapper is not None and orm_execute_state.bind_mapper.class_ in TRACKED:
+        orm_execute_state.session.info['cache_reload'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _apply_changes(session):
+    changes = session.info.pop('cache_changes', None)
+    touched = session.info.pop('cache_touched', False)
+    if session.info.pop('cache_reload', False):
+        catalogue.invalidate()
+        wish_progress.invalidate()
+        return
+    if touched:
+        catalogue.invalidate()
+    if changes:
+        wish_progress.apply(changes)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _drop_changes(session):
+    for key in ('cache_changes', 'cache_touched', 'cache_reload'):
+        session.info.pop(key, None)
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import threading
+import time
+
+from sqlalchemy.orm import selectinload
+
+from .models import Charities, Wishes
+from .replicas import primary_session
+
+
+class CatalogueSnapshot:
+    """Serialized donor catalogue shared by every request in this worker.
+
+    Commits that touch charities or wishes mark it stale in this process (see
+    caches.py); other workers pick the change up once their copy is older than
+    `max_age`. While one thread rebuilds, the others keep serving the previous body.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._body = None
+        self._etag = None
+        self._built_at = 0.0
+        self._stale = True
+
+    def invalidate(self):
+        self._stale = True
+
+    def get(self, max_age):
+        expired = self._stale or time.monotonic() - self._built_at > max_age
+        if expired and self._lock.acquire(blocking=self._body is None):
+            try:
+                if self._stale or time.monotonic() - self._built_at > max_age:
+                    self._stale = False
+                    self._rebuild()
+            except Exception:
+                self._stale = True
+                raise
+            finally:
+                self._lock.release()
+        return self._body, self._etag
+
+    def _rebuild(self):
+        # One query for the charities and one selectin query for their open wishes,
+        # both on the primary so a lagging replica is never cached as fresh
+        with primary_session() as session:
+            charities = session.query(Charities).filter_by(active=True) \
+                .options(selectinload(Charities.wishes.and_(Wishes.fulfilled.is_(False)))) \
+                .order_by(Charities.id).all()
+            catalogue = [{
+                'id': charity.id,
+                'name': charity.name,
+                'description': charity.description,
+                'website': charity.website,
+                'image_url': charity.image_url,
+                'wishes': [{
+                    'id': wish.id,
+                    'name': wish.name,
+                    'description': wish.description,
+                    'unit_price': wish.unit_price,
+                    'quantity': wish.quantity,
+                    'current_price': wish.current_price,
+                    # Same target /getters/wishes reports, not the stored total_price
+                    'total_price': wish.unit_price * wish.quantity
+                } for wish in sorted(charity.wishes, key=lambda w: w.id)]
+            } for charity in charities]
+        body = json.dumps({'success': True, 'charities': catalogue}, separators=(',', ':')).encode()
+        self._body = body
+        self._etag = hashlib.sha1(body).hexdigest()
+        self._built_at = time.monotonic()
+
+
+catalogue = CatalogueSnapshot()
@@ -1,9 +1,106 @@
 import os
+from .replicas import replica_binds
+
+# Connection pool sizing per gunicorn worker model. Every worker process owns its
+# own pool, so the database sees (workers * (pool_size + max_overflow)) connections
+# at peak; keep that under the server's max_connections.
+#   sync:    one request at a time per process, 1 connection is enough plus a spare.
+#   gthread: one connection per thread (--threads), small overflow for bursts.
+#   gevent:  many greenlets per process, larger pool with overflow headroom.
+POOL_PROFILES = {
+    'sync': {'pool_size': 1, 'max_overflow': 1},
+    'gthread': {'pool_size': int(os.environ.get('GUNICORN_THREADS', 4)), 'max_overflow': 2},
+    'gevent': {'pool_size': 10, 'max_overflow': 20},
+}
+
+def pool_profile():
+    """DB_POOL_PROFILE, defaulting to the worker model gunicorn.conf.py picks.
+
+    gunicorn switches to gthread when GUNICORN_THREADS > 1; a sync-sized pool
+    would then leave the threads queueing on pool_timeout, so that pairing fails.
+    """
+    threads = int(os.environ.get('GUNICORN_THREADS', 1))
+    name = os.environ.get('DB_POOL_PROFILE') or ('gthread' if threads > 1 else 'sync')
+    if name not in POOL_PROFILES:
+        raise ValueError(f"DB_POOL_PROFILE must be one of {', '.join(POOL_PROFILES)}, not {name!r}")
+    if name == 'sync' and threads > 1:
+        raise ValueError(f"DB_POOL_PROFILE=sync gives each worker 1+1 connections, but "
+                         f"GUNICORN_THREADS={threads} runs {threads} requests at once; use gthread")
+    return POOL_PROFILES[name]
+
+def engine_options(uri):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from the pool profile and DB_* overrides."""
+    if not uri or uri.startswith('sqlite'):
+        # SQLite gets its tuning from connect-time pragmas (see app/engine.py)
+        return {'pool_pre_ping': True}
+
+    profile = pool_profile()
+    options = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', profile['pool_size'])),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', profile['max_overflow'])),
+        # Recycle before the server/proxy drops idle connections (Render ~5 min)
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 280)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'pool_pre_ping': True,
+    }
+    statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 15000))
+    if uri.startswith(('postgres', 'postgresql')) and statement_timeout:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+def async_engine_options(uri):
+    """Engine options for the asyncio engine behind the ASGI payment routes (asgi.py).
+
+    One event loop keeps many requests in flight, so it gets its own, larger pool
+    instead of a gunicorn worker profile. The statement timeout goes to asyncpg as
+    a server setting, since asyncpg has no libpq `options` string.
+    """
+    if not uri or uri.startswith('sqlite'):
+        return {}
+
+    options = {
+        'pool_size': int(os.environ.get('ASYNC_DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('ASYNC_DB_MAX_OVERFLOW', 10)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 280)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'pool_pre_ping': True,
+    }
+    statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 15000))
+    if uri.startswith(('postgres', 'postgresql')) and statement_timeout:
+        options['connect_args'] = {'server_settings': {'statement_timeout': str(statement_timeout)}}
+    return options
 
 class Config:
     """Base configuration settings."""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'hard_to_guess_string'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLITE_PRAGMAS = {}
+    # Read replicas: comma separated URLs in REPLICA_DATABASE_URLS become replica_N binds
+    SQLALCHEMY_BINDS = replica_binds(os.environ.get('REPLICA_DATABASE_URLS'))
+    REPLICA_BIND_KEYS = list(SQLALCHEMY_BINDS)
+    # How long reads go to the primary after a write (see app/replicas.py)
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    # Rate limiting: buckets live in-process unless a shared Redis URL is given
+    # (redis://host:6379/0; fakeredis:// runs the Redis code path in-process for local testing)
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', '1') != '0'
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL')
+    # Number of reverse proxies in front of the app that append to X-Forwarded-For.
+    # 0 uses the socket peer address; clients can forge any entries beyond these.
+    PROXY_HOPS = int(os.environ.get('PROXY_HOPS', 0))
+    # bcrypt cost factor; benchmarks/bench_bcrypt.py picks the highest that fits the login budget
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    BCRYPT_MAX_THREADS = int(os.environ.get('BCRYPT_MAX_THREADS', 2))
+    BCRYPT_MAX_QUEUE = int(os.environ.get('BCRYPT_MAX_QUEUE', 8))
+    # Months of payments kept in the hot table; older ones go to payments_archive
+    PAYMENTS_HOT_MONTHS = int(os.environ.get('PAYMENTS_HOT_MONTHS', 6))
+    # Donor catalogue: seconds browsers/CDNs (and other workers' snapshots) may reuse it,
+    # and how long a CDN may keep serving it stale while refetching
+    CATALOGUE_MAX_AGE = int(os.environ.get('CATALOGUE_MAX_AGE', 30))
+    CATALOGUE_STALE_WHILE_REVALIDATE = int(os.environ.get('CATALOGUE_STALE_WHILE_REVALIDATE', 300))
+    # Seconds before a worker reloads its wish progress snapshot to pick up other workers' writes
+    WISH_PROGRESS_MAX_AGE = int(os.environ.get('WISH_PROGRESS_MAX_AGE', 30))
+    # Seconds a verified token's identity is reused by @admin_required
+    JWT_IDENTITY_CACHE_TTL = int(os.environ.get('JWT_IDENTITY_CACHE_TTL', 60))
     
     @staticmethod
     def init_app(app):
@@ -12,9 +109,18 @@ class Config:
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DEV_DATABASE_URL') or 'sqlite:///dev.sqlite'
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    ASYNC_ENGINE_OPTIONS = async_engine_options(SQLALCHEMY_DATABASE_URI)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+    }
 
 class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    ASYNC_ENGINE_OPTIONS = async_engine_options(SQLALCHEMY_DATABASE_URI)
 
     @classmethod
     def init_app(cls, app):
@@ -22,14 +128,15 @@ class ProductionConfig(Config):
         import logging
         from logging.handlers import RotatingFileHandler
         
-        file_handler = RotatingFileHandler('api.log', maxBytes=10240, backupCount=10)
+        # delay=True: the file is opened on the first record, i.e. in the worker that
+        # writes it, not at boot (and not in a gunicorn --preload master)
+        file_handler = RotatingFileHandler('api.log', maxBytes=10240, backupCount=10, delay=True)
         file_handler.setFormatter(logging.Formatter(
             '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
         ))
         file_handler.setLevel(logging.INFO)
         app.logger.addHandler(file_handler)
         app.logger.setLevel(logging.INFO)
-        app.logger.info('API starting up')
 
 config = {
     'development': DevelopmentConfig,
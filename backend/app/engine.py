@@ -0,0 +1,79 @@
+import threading
+import time
+
+from sqlalchemy import event
+
+from .extensions import db
+
+_lock = threading.Lock()
+pool_stats = {
+    'connects': 0,
+    'checkouts': 0,
+    'checkins': 0,
+    'invalidations': 0,
+    'max_checked_out': 0,
+    'max_checkout_seconds': 0.0,
+}
+
+
+def _bump(key, amount=1):
+    with _lock:
+        pool_stats[key] += amount
+
+
+def _sqlite_pragma_setter(pragmas):
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+    return set_sqlite_pragmas
+
+
+def init_engine(app):
+    """Attach SQLite pragmas to every bind and pool-usage counters to the primary."""
+    with app.app_context():
+        engine = db.engine
+        engines = list(db.engines.values())
+
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    for bind in engines:
+        if bind.dialect.name == 'sqlite' and pragmas:
+            event.listen(bind, 'connect', _sqlite_pragma_setter(pragmas))
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        _bump('connects')
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.perf_counter()
+        with _lock:
+            pool_stats['checkouts'] += 1
+            in_use = pool_stats['checkouts'] - pool_stats['checkins']
+            pool_stats['max_checked_out'] = max(pool_stats['max_checked_out'], in_use)
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop('checked_out_at', None)
+        with _lock:
+            pool_stats['checkins'] += 1
+            if started is not None:
+                held = time.perf_counter() - started
+                pool_stats['max_checkout_seconds'] = max(pool_stats['max_checkout_seconds'], held)
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        _bump('invalidations')
+
+
+def pool_snapshot():
+    """Current pool occupancy plus the counters collected since worker start."""
+    pool = db.engine.pool
+    snapshot = dict(pool_stats)
+    snapshot['pool_class'] = type(pool).__name__
+    snapshot['status'] = pool.status()
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        if hasattr(pool, name):
+            snapshot[name] = getattr(pool, name)()
+    return snapshot
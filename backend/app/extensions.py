@@ -1,11 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
-from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
+from .replicas import RoutingSession
+from .ratelimit import RateLimiter
 
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
-migrate = Migrate()
-bcrypt = Bcrypt()
\ No newline at end of file
+bcrypt = Bcrypt()
+limiter = RateLimiter()
\ No newline at end of file
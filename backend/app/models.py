@@ -1,5 +1,19 @@
+from datetime import datetime
 from .extensions import db
 
+# parse_transaction's stand-in for payers the gateway gave no email for
+UNKNOWN_DONOR_EMAIL = "unknown@example.com"
+
+
+def _dialect_insert(session):
+    """INSERT construct with ON CONFLICT support for the session's database."""
+    if session.get_bind(mapper=Donors).dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
 class User(db.Model):
     __tablename__ = 'users'
 
@@ -64,8 +78,147 @@ class Payments(db.Model):
     amount = db.Column(db.Float, nullable=False)
     payment_date = db.Column(db.DateTime, server_default=db.func.now())
     donor_email = db.Column(db.String(150), nullable=True)
+    reference = db.Column(db.String(100), unique=True, nullable=True)
 
     wish = db.relationship('Wishes', backref=db.backref('payments', lazy=True))
 
+    # Serves the per-donor history listing (filter by email, newest first)
+    # and date-range listings / monthly archiving. AUTOINCREMENT stops SQLite
+    # from reusing the ids of payments moved to payments_archive.
+    __table_args__ = (
+        db.Index('ix_payments_donor_email_payment_date', 'donor_email', 'payment_date'),
+        db.Index('ix_payments_payment_date', 'payment_date'),
+        {'sqlite_autoincrement': True},
+    )
+
+    @staticmethod
+    def record(wish, quantity, unit_price, amount, donor_email, reference=None, paid_at=None, session=None):
+        """Add a payment and its donor aggregates to the session; the caller commits."""
+        session = session or db.session
+        payment = Payments(
+            wish_id=wish.id,
+            quantity=quantity,
+            unit_price=unit_price,
+            amount=amount,
+            donor_email=donor_email,
+            reference=reference
+        )
+        if paid_at is not None:
+            payment.payment_date = paid_at
+        session.add(payment)
+        if reference:
+            session.add(PaymentReferences(reference=reference))
+        # Keep the donor leaderboard aggregates in step with the payment row
+        Donors.record_payment(donor_email, wish.charity_id, amount, paid_at, session=session)
+        return payment
+
+    def __repr__(self):
+        return f'<Payments {self.id} for Wish ID {self.wish_id}>'
+
+class PaymentReferences(db.Model):
+    """Every gateway reference recorded, whether its payment is still in payments
+    or was moved to payments_archive.
+
+    Rows are never archived, so the primary key keeps a reference unique across
+    both tables (a unique index on the partitioned archive would have to include
+    payment_date). Duplicate-charge checks read from here.
+    """
+    __tablename__ = 'payment_references'
+
+    reference = db.Column(db.String(100), primary_key=True)
+
+    @staticmethod
+    def exists(reference, session=None):
+        session = session or db.session
+        return session.get(PaymentReferences, reference) is not None
+
+    def __repr__(self):
+        return f'<PaymentReferences {self.reference}>'
+
+class PaymentsArchive(db.Model):
+    """Payments from closed months, moved out of the hot table by `flask archive-payments`.
+
+    On PostgreSQL this is a native table partitioned by month on payment_date,
+    hence payment_date in the primary key; on SQLite it is a plain table.
+    """
+    __tablename__ = 'payments_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    payment_date = db.Column(db.DateTime, primary_key=True)
+    wish_id = db.Column(db.Integer, db.ForeignKey('wishes.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    unit_price = db.Column(db.Float, nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    donor_email = db.Column(db.String(150), nullable=True)
+    reference = db.Column(db.String(100), nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_payments_archive_payment_date', 'payment_date'),
+        db.Index('ix_payments_archive_donor_email_payment_date', 'donor_email', 'payment_date'),
+    )
+
+    def __repr__(self):
+        return f'<PaymentsArchive {self.id} for Wish ID {self.wish_id}>'
+
+class Donors(db.Model):
+    """Running totals per donor email, updated as each payment is recorded."""
+    __tablename__ = 'donors'
+
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(150), unique=True, nullable=False)
+    total_given = db.Column(db.Float, nullable=False, default=0.0, index=True)
+    donation_count = db.Column(db.Integer, nullable=False, default=0)
+    charities_supported = db.Column(db.Integer, nullable=False, default=0)
+    first_donation_at = db.Column(db.DateTime, nullable=True)
+    last_donation_at = db.Column(db.DateTime, nullable=True)
+
+    @staticmethod
+    def record_payment(email, charity_id, amount, paid_at=None, session=None):
+        """Fold a single payment into the donor's aggregate row.
+
+        Runs as SQL-side upserts and increments so concurrent callbacks for the
+        same donor neither lose updates nor trip the unique email. Executes in the
+        caller's transaction; the caller commits together with the payment.
+        """
+        if not email or email == UNKNOWN_DONOR_EMAIL:
+            return  # anonymous payments would all pile onto one fake donor
+        session = session or db.session
+        paid_at = paid_at or datetime.utcnow()
+        insert = _dialect_insert(session)
+
+        donor = insert(Donors).values(email=email, total_given=amount, donation_count=1,
+                                      charities_supported=0, first_donation_at=paid_at,
+                                      last_donation_at=paid_at)
+        session.execute(donor.on_conflict_do_update(index_elements=['email'], set_={
+            'total_given': Donors.total_given + donor.excluded.total_given,
+            'donation_count': Donors.donation_count + 1,
+            'first_donation_at': db.case(
+                (db.or_(Donors.first_donation_at.is_(None), donor.excluded.first_donation_at < Donors.first_donation_at),
+                 donor.excluded.first_donation_at),
+                else_=Donors.first_donation_at),
+            'last_donation_at': db.case(
+                (db.or_(Donors.last_donation_at.is_(None), donor.excluded.last_donation_at > Donors.last_donation_at),
+                 donor.excluded.last_donation_at),
+                else_=Donors.last_donation_at),
+        }))
+
+        if charity_id is not None:
+            supported = session.execute(insert(DonorCharities).values(donor_email=email, charity_id=charity_id)
+                                        .on_conflict_do_nothing(index_elements=['donor_email', 'charity_id']))
+            # Only the transaction that actually added the pair bumps the count
+            if supported.rowcount:
+                session.execute(db.update(Donors).where(Donors.email == email)
+                                .values(charities_supported=Donors.charities_supported + 1))
+
+    def __repr__(self):
+        return f'<Donors {self.email}>'
+
+class DonorCharities(db.Model):
+    """Distinct (donor, charity) pairs backing Donors.charities_supported."""
+    __tablename__ = 'donor_charities'
+
+    donor_email = db.Column(db.String(150), db.ForeignKey('donors.email'), primary_key=True)
+    charity_id = db.Column(db.Integer, db.ForeignKey('charities.id'), primary_key=True)
+
     def __repr__(self):
-        return f'<Payments {self.id} for Wish ID {self.wish_id}>'
\ No newline at end of file
+        return f'<DonorCharities {self.donor_email} -> Charity ID {self.charity_id}>'
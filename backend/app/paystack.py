@@ -0,0 +1,117 @@
+import os
+import threading
+
+PAYSTACK_SECRET_KEY = os.environ.get('PAYSTACK_SECRET_KEY', "sk_test_84af6feb64e3d2a52369d14c6c2e3bff3f3b387a")
+# Point PAYSTACK_BASE_URL at a local stand-in (see paystack_stub.py) to run without the real gateway
+PAYSTACK_BASE_URL = os.environ.get('PAYSTACK_BASE_URL', "https://api.paystack.co").rstrip('/')
+PAYSTACK_INIT_URL = f"{PAYSTACK_BASE_URL}/transaction/initialize"
+PAYSTACK_VERIFY_URL = f"{PAYSTACK_BASE_URL}/transaction/verify/"
+PAYSTACK_LIST_URL = f"{PAYSTACK_BASE_URL}/transaction"
+PAYSTACK_CALLBACK_URL = os.environ.get('PAYSTACK_CALLBACK_URL', "https://giving-tree-admin.onrender.com/payments/payment_callback")
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def http_session():
+    """Shared keep-alive session for gateway calls.
+
+    requests is imported on first use rather than at app start, and the session
+    is created after gunicorn forks, so workers never share sockets.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                _session = requests.Session()
+    return _session
+
+
+def auth_headers():
+    return {"Authorization": f"Bearer {PAYSTACK_SECRET_KEY}"}
+
+
+def verify_transaction(reference, timeout=10):
+    response = http_session().get(f"{PAYSTACK_VERIFY_URL}{reference}", headers=auth_headers(), timeout=timeout)
+    return response.json()
+
+
+def list_transactions(start, end, page=1, per_page=100, status='success', timeout=30):
+    """Fetch one page of the gateway's transaction list for [start, end]."""
+    params = {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'page': page,
+        'perPage': per_page,
+        'status': status
+    }
+    response = http_session().get(PAYSTACK_LIST_URL, params=params, headers=auth_headers(), timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def iter_transaction_pages(start, end, per_page=100):
+    """Yield the gateway's transactions one page (chunk) at a time."""
+    page = 1
+    while True:
+        body = list_transactions(start, end, page=page, per_page=per_page)
+        transactions = body.get('data') or []
+        if transactions:
+            yield transactions
+        meta = body.get('meta') or {}
+        page_count = meta.get('pageCount') or 0
+        if not transactions or page >= page_count:
+            break
+        page += 1
+
+
+# Helper function to safely get integers
+def safe_int(value, default=0):
+    try:
+        if value is None or value == '':
+            return default
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+# Helper function to safely get floats
+def safe_float(value, default=0.0):
+    try:
+        if value is None or value == '':
+            return default
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def parse_transaction(data):
+    """Pull the fields we record out of a gateway transaction object."""
+    metadata = data.get('metadata') if isinstance(data, dict) else None
+    if not isinstance(metadata, dict):
+        metadata = {}
+
+    paid_amount = safe_float(data.get('amount')) / 100  # Convert back to Naira
+
+    # Paystack usually returns the payer email under the `customer` object
+    # Try several places so we robustly capture the email
+    customer = data.get('customer') or {}
+    paid_email = customer.get('email') if isinstance(customer, dict) else None
+    if not paid_email:
+        paid_email = data.get('email')
+    # As a last resort, check metadata in case client passed email there
+    if not paid_email:
+        paid_email = metadata.get('email')
+    if not paid_email:
+        paid_email = "unknown@example.com"  # Fallback email
+
+    return {
+        'reference': data.get('reference'),
+        'item_id': safe_int(metadata.get('item_id'), default=None),  # Keep None if ID is missing
+        'quantity': safe_int(metadata.get('quantity'), default=1),
+        'unit_price': safe_float(metadata.get('unit_price'), default=0.0),
+        'amount': paid_amount,
+        'email': paid_email
+    }
@@ -0,0 +1,184 @@
+import threading
+import time
+from array import array
+
+from .models import Charities, Wishes
+from .replicas import primary_session
+
+
+class WishProgress:
+    """Column-oriented, in-memory copy of every wish and its funding progress.
+
+    One array (or list, for strings) per field and a wish id -> row map keep the
+    footprint small and let a donation update two slots in place. Commits in this
+    worker are applied as they happen; other workers' writes show up when the copy
+    is older than `max_age` and gets reloaded. Changes reach it through the
+    session hooks in caches.py.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._clear()
+        self._loaded_at = None
+
+    def _clear(self):
+        self.row = {}
+        self.ids = array('q')
+        self.unit_price = array('d')
+        self.quantity = array('q')
+        self.target = array('d')      # unit_price * quantity, shown as total_price
+        self.goal = array('d')        # stored total_price, which decides fulfilled
+        self.raised = array('d')
+        self.fulfilled = bytearray()
+        self.charity = array('q')     # index into charity_names
+        self.names = []
+        self.descriptions = []
+        self.created = []
+        self.charity_names = []
+        self._charity_index = {}
+
+    # -- loading -------------------------------------------------------------
+
+    def load(self):
+        # From the primary: a reload follows a write, which a replica may not have yet
+        with primary_session() as session:
+            rows = session.query(Wishes, Charities.name) \
+                .outerjoin(Charities, Wishes.charity_id == Charities.id) \
+                .order_by(Wishes.id).all()
+            with self._lock:
+                self._clear()
+                for wish, charity_name in rows:
+                    self._append(wish, charity_name)
+                self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def ensure_fresh(self, max_age):
+        """Reload when never loaded or older than max_age; only one thread reloads."""
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at <= max_age:
+            return
+        # Readers keep the current copy while someone else reloads it
+        if self._reload_lock.acquire(blocking=loaded_at is None and not self.ids):
+            try:
+                if self._loaded_at is None or time.monotonic() - self._loaded_at > max_age:
+                    self.load()
+            finally:
+                self._reload_lock.release()
+
+    def _charity_ref(self, charity_name):
+        ref = self._charity_index.get(charity_name)
+        if ref is None:
+            ref = self._charity_index[charity_name] = len(self.charity_names)
+            self.charity_names.append(charity_name)
+        return ref
+
+    def _append(self, wish, charity_name):
+        self.row[wish.id] = len(self.ids)
+        self.ids.append(wish.id)
+        self.unit_price.append(0.0)
+        self.quantity.append(0)
+        self.target.append(0.0)
+        self.goal.append(0.0)
+        self.raised.append(0.0)
+        self.fulfilled.append(0)
+        self.charity.append(0)
+        self.names.append(None)
+        self.descriptions.append(None)
+        self.created.append(None)
+        self._set(self.row[wish.id], wish, charity_name)
+
+    def _set(self, i, wish, charity_name):
+        self.unit_price[i] = wish.unit_price
+        self.quantity[i] = int(wish.quantity)
+        self.target[i] = wish.unit_price * wish.quantity
+        self.goal[i] = wish.total_price
+        self.raised[i] = wish.current_price or 0.0
+        self.fulfilled[i] = 1 if wish.fulfilled else 0
+        self.charity[i] = self._charity_ref(charity_name or "Unknown Charity")
+        self.names[i] = wish.name
+        self.descriptions[i] = wish.description
+        self.created[i] = wish.created_at.isoformat() if wish.created_at else None
+
+    # -- in-place updates ----------------------------------------------------
+
+    def apply(self, changes):
+        """Apply (kind, payload) changes captured from a committed session."""
+        with self._lock:
+            if self._loaded_at is None:
+                return  # next read loads everything anyway
+            for kind, payload in changes:
+                if kind == 'wish':
+                    wish, charity_name = payload
+                    i = self.row.get(wish.id)
+                    if i is None:
+                        self._append(wish, charity_name)
+                    else:
+                        self._set(i, wish, charity_name)
+                elif kind == 'delete':
+                    self._remove(payload)
+                elif kind == 'charity':
+                    charity_id, old_name, new_name = payload
+                    ref = self._charity_index.pop(old_name, None)
+                    if ref is not None:
+                        self.charity_names[ref] = new_name
+                        self._charity_index[new_name] = ref
+
+    def record_donation(self, wish_id, amount):
+        with self._lock:
+            i = self.row.get(wish_id)
+            if i is None:
+                return
+            self.raised[i] += amount
+            if self.raised[i] >= self.goal[i]:
+                self.fulfilled[i] = 1
+
+    def _remove(self, wish_id):
+        i = self.row.pop(wish_id, None)
+        if i is None:
+            return
+        for column in (self.ids, self.unit_price, self.quantity, self.target, self.goal, self.raised,
+                       self.fulfilled, self.charity, self.names, self.descriptions, self.created):
+            del column[i]
+        for position in range(i, len(self.ids)):
+            self.row[self.ids[position]] = position
+
+    # -- reads ---------------------------------------------------------------
+
+    def _wish(self, i):
+        return {
+            'id': self.ids[i],
+            'name': self.names[i],
+            'description': self.descriptions[i],
+            'unit_price': self.unit_price[i],
+            'quantity': self.quantity[i],
+            'current_price': self.raised[i],
+            'total_price': self.target[i],
+            'charity_name': self.charity_names[self.charity[i]],
+            'fulfilled': bool(self.fulfilled[i]),
+            'created_at': self.created[i]
+        }
+
+    def wishes(self):
+        with self._lock:
+            return [self._wish(i) for i in range(len(self.ids))]
+
+    def progress(self, wish_id):
+        with self._lock:
+            i = self.row.get(wish_id)
+            if i is None:
+                return None
+            target, raised = self.target[i], self.raised[i]
+            return {
+                'id': self.ids[i],
+                'charity_name': self.charity_names[self.charity[i]],
+                'target': target,
+                'raised': raised,
+                'percent': round(min(raised / target, 1.0) * 100, 1) if target else 0.0,
+                'fulfilled': bool(self.fulfilled[i])
+            }
+
+
+wish_progress = WishProgress()
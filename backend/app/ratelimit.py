@@ -0,0 +1,175 @@
+import math
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify, request
+
+
+class MemoryStore:
+    """Token buckets kept in this process. Each worker limits independently."""
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def take(self, buckets, now=None):
+        """Take one token from every (key, rate, capacity) bucket, or from none.
+
+        Returns 0 if allowed, else seconds until all of them have a token again.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            levels = []
+            wait = 0
+            for key, rate, capacity in buckets:
+                tokens, last = self._buckets.get(key, (capacity, now))
+                tokens = min(capacity, tokens + (now - last) * rate)
+                levels.append(tokens)
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / rate)
+            # A refused request must not drain a bucket another rule let it through
+            for (key, rate, capacity), tokens in zip(buckets, levels):
+                self._buckets[key] = (tokens if wait else tokens - 1, now)
+
+            self._calls += 1
+            if self._calls >= self.PRUNE_EVERY:
+                self._calls = 0
+                self._prune(now)
+        return wait
+
+    def _prune(self, now):
+        # Buckets idle for an hour have long since refilled, so dropping them changes nothing
+        idle = [k for k, (tokens, last) in self._buckets.items() if last < now - 3600]
+        for k in idle:
+            del self._buckets[k]
+
+
+class RedisStore:
+    """Token buckets shared by every worker through Redis (needs the `redis` package).
+
+    A fakeredis:// URL runs the same script against an in-process fakeredis server
+    (needs `fakeredis[lua]`, see requirements-dev.txt). It is not shared between
+    workers, but it lets tests and benchmarks exercise this store without a Redis.
+    """
+
+    # ARGV: now, then rate and capacity for each key in KEYS
+    SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local levels = {}
+    local wait = 0
+    for i, key in ipairs(KEYS) do
+        local rate, capacity = tonumber(ARGV[i * 2]), tonumber(ARGV[i * 2 + 1])
+        local tokens = tonumber(redis.call('HGET', key, 't') or capacity)
+        local last = tonumber(redis.call('HGET', key, 'l') or now)
+        tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+        levels[i] = tokens
+        if tokens < 1 then wait = math.max(wait, (1 - tokens) / rate) end
+    end
+    for i, key in ipairs(KEYS) do
+        local rate, capacity = tonumber(ARGV[i * 2]), tonumber(ARGV[i * 2 + 1])
+        local tokens = levels[i]
+        if wait == 0 then tokens = tokens - 1 end
+        redis.call('HSET', key, 't', tokens, 'l', now)
+        redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+    end
+    return tostring(wait)
+    """
+
+    def __init__(self, url):
+        if url.startswith('fakeredis://'):
+            import fakeredis
+            self._client = fakeredis.FakeRedis()
+        else:
+            import redis
+            self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(self.SCRIPT)
+
+    def take(self, buckets, now=None):
+        now = time.time() if now is None else now
+        args = [now]
+        for key, rate, capacity in buckets:
+            args += [rate, capacity]
+        return float(self._take(keys=[f'ratelimit:{key}' for key, _, _ in buckets], args=args))
+
+
+def forwarded_for(value, hops):
+    """The address `hops` trusted proxies back in an X-Forwarded-For value.
+
+    Only the rightmost entries were added by our own proxies; anything left of
+    them came from the client and can be forged. Returns None if there are
+    fewer entries than hops.
+    """
+    entries = [e.strip() for e in (value or '').split(',') if e.strip()]
+    if hops <= 0 or len(entries) < hops:
+        return None
+    return entries[-hops]
+
+
+def client_ip():
+    # With PROXY_HOPS set, ProxyFix (see create_app) has already put the
+    # address the nearest trusted proxy saw into remote_addr
+    return request.remote_addr or 'unknown'
+
+
+class RateLimiter:
+    """Per-IP and per-route token buckets applied with the @limiter.limit decorator."""
+
+    def __init__(self):
+        self.store = MemoryStore()
+        self.enabled = True
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        url = app.config.get('RATELIMIT_STORAGE_URL')
+        # No URL (or memory://) keeps the per-process store; redis:// and
+        # fakeredis:// go through RedisStore
+        if url and not url.startswith('memory://'):
+            self.store = RedisStore(url)
+        app.extensions['ratelimit'] = self
+
+    def limit(self, count, per=60, burst=None, key='ip'):
+        """Allow `count` requests every `per` seconds, bursting up to `burst`.
+
+        key='ip' gives every client its own bucket; key='route' shares one bucket
+        between all clients of the route. Stack the decorator to apply both.
+        """
+        rule = (key, count / per, burst or count)
+
+        def decorator(view):
+            limits = getattr(view, 'rate_limits', None)
+            if limits is not None:
+                limits.append(rule)
+                return view
+
+            @wraps(view)
+            def wrapped(*args, **kwargs):
+                retry_after = self.check(wrapped.rate_limits, request.endpoint, client_ip())
+                if retry_after:
+                    return self.too_many_requests(retry_after)
+                return view(*args, **kwargs)
+
+            wrapped.rate_limits = [rule]
+            return wrapped
+        return decorator
+
+    def check(self, limits, endpoint, ip):
+        """Return 0 when the request may proceed, else the Retry-After in seconds."""
+        if not self.enabled:
+            return 0
+        # Per-client rules first; all buckets are charged together or not at all,
+        # so one noisy client can't use up a shared route bucket
+        buckets = [(f'{endpoint}:{ip}' if key == 'ip' else endpoint, rate, capacity)
+                   for key, rate, capacity in sorted(limits, key=lambda rule: rule[0] != 'ip')]
+        wait = self.store.take(buckets)
+        return max(1, math.ceil(wait)) if wait else 0
+
+    @staticmethod
+    def too_many_requests(retry_after):
+        response = jsonify({'success': False, 'message': 'Too many requests, please try again later'})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
@@ -0,0 +1,198 @@
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+
+from sqlalchemy import func
+
+from .extensions import db
+from .models import Payments, PaymentReferences, PaymentsArchive, Wishes
+from .paystack import iter_transaction_pages, verify_transaction, parse_transaction
+
+
+# Legacy rows are indexed over the window widened by this much on each side. Their
+# payment_date comes from the database clock (not necessarily UTC) and can sit on the
+# other side of a window edge from the gateway's paid_at for the same charge. Rows in
+# the padding may be claimed but are never reported: their charges can lie outside
+# the window the gateway was asked for.
+LEGACY_WINDOW_PADDING = timedelta(days=1)
+
+
+def _fingerprint(email, amount, wish_id):
+    """Key used to pair gateway charges with legacy rows recorded before we stored references."""
+    return ((email or '').strip().lower(), round(amount or 0.0, 2), wish_id)
+
+
+def _parse_paid_at(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _unreferenced_payments(start, end, chunk_size):
+    """Index legacy payments in the (padded) window by fingerprint, streaming rows from the DB.
+
+    Covers hot and archived payments; each entry is (model, id, payment_date).
+    """
+    index = defaultdict(deque)
+    for model in (Payments, PaymentsArchive):
+        rows = db.session.query(model.id, model.payment_date, model.donor_email, model.amount, model.wish_id) \
+            .filter(model.reference.is_(None)) \
+            .filter(model.payment_date.between(start - LEGACY_WINDOW_PADDING, end + LEGACY_WINDOW_PADDING)) \
+            .order_by(model.id) \
+            .yield_per(chunk_size)
+        for payment_id, paid_at, email, amount, wish_id in rows:
+            index[_fingerprint(email, amount, wish_id)].append((model, payment_id, paid_at))
+    return index
+
+
+def _claim(candidates, paid_at):
+    """Take the legacy row dated closest to the charge (the oldest one if paid_at is unknown)."""
+    if paid_at is None:
+        return candidates.popleft()
+    best = min(candidates, key=lambda row: abs(row[2] - paid_at))
+    candidates.remove(best)
+    return best
+
+
+def _unclaimed_in_window(legacy, start, end):
+    """Legacy rows dated inside [start, end] that no gateway charge claimed."""
+    return sorted((model is PaymentsArchive, payment_id)
+                  for rows in legacy.values()
+                  for model, payment_id, paid_at in rows
+                  if start <= paid_at <= end)
+
+
+def _verify_all(references, workers):
+    """Re-verify candidate references against the gateway with a bounded thread pool."""
+    verified = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(verify_transaction, ref): ref for ref in references}
+        for future in as_completed(futures):
+            ref = futures[future]
+            try:
+                body = future.result()
+            except Exception as e:
+                click.echo(f"  ! verify failed for {ref}: {e}", err=True)
+                continue
+            if body.get('status') and (body.get('data') or {}).get('status') == 'success':
+                verified[ref] = body['data']
+    return verified
+
+
+def _matches_legacy_row(paid):
+    """True when any payment without a reference, at any date, has this charge's fingerprint."""
+    email, amount, wish_id = _fingerprint(paid['email'], paid['amount'], paid['item_id'])
+    return any(
+        db.session.query(model.id)
+        .filter(model.reference.is_(None), model.wish_id == wish_id)
+        .filter(func.lower(func.trim(model.donor_email)) == email)
+        .filter(func.abs(model.amount - amount) < 0.005)
+        .first() is not None
+        for model in (Payments, PaymentsArchive))
+
+
+def _repair_missing(data):
+    paid = parse_transaction(data)
+    if _matches_legacy_row(paid):
+        # Probably recorded before references were stored, outside the padded window
+        click.echo(f"  ! {paid['reference']}: matches a payment without a reference, left for manual review",
+                   err=True)
+        return False
+    wish = Wishes.query.get(paid['item_id']) if paid['item_id'] is not None else None
+    if not wish:
+        click.echo(f"  ! {paid['reference']}: no wish for item_id={paid['item_id']}, left for manual review", err=True)
+        return False
+    Payments.record(wish, paid['quantity'], paid['unit_price'], paid['amount'], paid['email'],
+                    reference=paid['reference'], paid_at=_parse_paid_at(data.get('paid_at')))
+    db.session.commit()
+    Wishes.update_current_price(wish.id, paid['amount'])
+    return True
+
+
+@click.command('reconcile-payments')
+@click.option('--from', 'start', type=click.DateTime(), default=None,
+              help='Start of the window (default: 24 hours ago).')
+@click.option('--to', 'end', type=click.DateTime(), default=None,
+              help='End of the window (default: now).')
+@click.option('--chunk-size', default=100, show_default=True,
+              help='Gateway page size and DB streaming batch size.')
+@click.option('--workers', default=8, show_default=True,
+              help='Max concurrent verify calls against the gateway.')
+@click.option('--repair/--report-only', default=False,
+              help='Record missing charges and backfill references on matched legacy rows.')
+@with_appcontext
+def reconcile_payments(start, end, chunk_size, workers, repair):
+    """Compare gateway transactions with recorded Payments for a date window."""
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=1)
+    click.echo(f"Reconciling payments from {start.isoformat()} to {end.isoformat()}")
+
+    legacy = _unreferenced_payments(start, end, chunk_size)
+    seen_refs = set()
+    missing = []
+    matched = 0
+    backfilled = 0
+
+    for chunk in iter_transaction_pages(start, end, per_page=chunk_size):
+        by_ref = {t['reference']: t for t in chunk if t.get('reference')}
+        refs = set(by_ref) - seen_refs
+        seen_refs.update(refs)
+        if not refs:
+            continue
+
+        # Hot and archived payments alike
+        recorded = {r for (r,) in db.session.query(PaymentReferences.reference)
+                    .filter(PaymentReferences.reference.in_(refs))}
+        matched += len(recorded)
+
+        for ref in refs - recorded:
+            paid = parse_transaction(by_ref[ref])
+            ids = legacy.get(_fingerprint(paid['email'], paid['amount'], paid['item_id']))
+            if ids:
+                # Recorded before references were stored; claim one legacy row
+                model, payment_id, paid_at = _claim(ids, _parse_paid_at(by_ref[ref].get('paid_at')))
+                matched += 1
+                if repair:
+                    model.query.filter_by(id=payment_id, payment_date=paid_at).update({'reference': ref})
+                    db.session.add(PaymentReferences(reference=ref))
+                    backfilled += 1
+            else:
+                missing.append(ref)
+
+        if repair:
+            db.session.commit()
+
+    # Legacy rows left unclaimed have no charge behind them: double-recorded or never paid
+    unmatched = _unclaimed_in_window(legacy, start, end)
+
+    verified = _verify_all(missing, workers) if missing else {}
+    unconfirmed = sorted(set(missing) - set(verified))
+
+    repaired = 0
+    if repair:
+        for ref in sorted(verified):
+            try:
+                if _repair_missing(verified[ref]):
+                    repaired += 1
+            except Exception as e:
+                db.session.rollback()
+                click.echo(f"  ! failed to record {ref}: {e}", err=True)
+
+    click.echo(f"Gateway transactions: {len(seen_refs)}")
+    click.echo(f"Matched: {matched} (references backfilled: {backfilled})")
+    click.echo(f"Charged but not recorded: {len(verified)} (repaired: {repaired})")
+    for ref in sorted(verified):
+        click.echo(f"  - {ref}")
+    if unconfirmed:
+        click.echo(f"Listed by gateway but not verified as successful: {len(unconfirmed)}")
+        for ref in unconfirmed:
+            click.echo(f"  - {ref}")
+    click.echo(f"Recorded without a matching charge (possible duplicates): {len(unmatched)}")
+    for archived, payment_id in unmatched:
+        click.echo(f"  - {'archived ' if archived else ''}payment {payment_id}")
@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session as PlainSession
+
+# Response header carrying the time until which a client should read from the primary.
+# Clients may echo it back on later requests; unlike a cookie it survives plain
+# cross-origin fetch calls (the admin app sends no credentials).
+STICKY_HEADER = 'X-DB-Primary-Until'
+
+
+class StickyClients:
+    """Per-client "read from the primary until" times, kept in this process.
+
+    Covers clients that don't echo STICKY_HEADER, as long as their next request
+    reaches the worker that handled the write. Only the writing client is pinned;
+    everyone else keeps reading from the replicas.
+    """
+
+    def __init__(self, maxsize=10000):
+        self._until = {}
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+
+    def pin(self, key, window):
+        now = time.time()
+        with self._lock:
+            until = self._until[key] = max(self._until.get(key, 0), now + window)
+            if len(self._until) > self.maxsize:
+                for k in [k for k, t in self._until.items() if t <= now]:
+                    del self._until[k]
+        return until
+
+    def pinned(self, key):
+        with self._lock:
+            until = self._until.get(key)
+            if until is None:
+                return False
+            if until <= time.time():
+                del self._until[key]
+                return False
+            return True
+
+
+sticky_clients = StickyClients()
+
+
+def client_key(ip=None):
+    """Who a write is attributed to: the bearer token if any, else the client address."""
+    if ip is None:
+        auth = request.headers.get('Authorization')
+        if auth:
+            return f'auth:{auth}'
+        from .ratelimit import client_ip
+        ip = client_ip()
+    return f'ip:{ip}'
+
+
+class RoutingSession(Session):
+    """Sends reads to a replica bind when the current request opted in.
+
+    Flushes (and so every INSERT/UPDATE/DELETE) always go to the primary, as do
+    requests that did not opt in or whose client wrote within the sticky window.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context():
+            replica = g.get('db_replica')
+            if replica is not None:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_binds(urls):
+    """Map comma separated replica URLs to replica_N bind keys."""
+    urls = [u.strip() for u in (urls or '').split(',') if u.strip()]
+    return {f'replica_{i}': url for i, url in enumerate(urls, start=1)}
+
+
+@contextmanager
+def primary_session():
+    """A short-lived session on the primary, whatever the request routes to.
+
+    For reads whose result outlives the request, like cache rebuilds: a lagging
+    replica would otherwise be cached as fresh.
+    """
+    from .extensions import db
+    with PlainSession(db.engine) as session:
+        yield session
+
+
+def note_write(key, window):
+    """Send the client's replica-routed reads in this process to the primary for `window` seconds."""
+    return sticky_clients.pin(key, window)
+
+
+def _echoed_until(window):
+    try:
+        until = float(request.headers.get(STICKY_HEADER, 0))
+    except ValueError:
+        return 0
+    # A client can ask to skip the replicas for one window at most
+    return min(until, time.time() + window)
+
+
+def route_reads_to_replicas(blueprint):
+    """Route the blueprint's queries to a replica, honouring read-your-writes."""
+    @blueprint.before_request
+    def pick_replica():
+        from flask import current_app
+        keys = current_app.config.get('REPLICA_BIND_KEYS') or []
+        if not keys:
+            return
+        now = time.time()
+        window = current_app.config.get('REPLICA_STICKY_SECONDS', 5)
+        if _echoed_until(window) > now or sticky_clients.pinned(client_key()):
+            return
+        # One replica per request so all its reads see the same snapshot
+        g.db_replica = random.choice(keys)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def mark_write(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def mark_bulk_write(orm_execute_state):
+    # Query.update()/delete() and insert() statements never flush
+    if has_request_context() and (orm_execute_state.is_update or orm_execute_state.is_delete
+                                  or orm_execute_state.is_insert):
+        g.db_wrote = True
+
+
+def init_replicas(app):
+    """Send reads to the primary for REPLICA_STICKY_SECONDS after a write.
+
+    The writing worker does so for the client that wrote (by token or address);
+    other workers do so for clients that echo the STICKY_HEADER they were given.
+    """
+    window = app.config.get('REPLICA_STICKY_SECONDS', 5)
+
+    @app.after_request
+    def mark_primary_window(response):
+        if app.config.get('REPLICA_BIND_KEYS') and g.get('db_wrote'):
+            response.headers[STICKY_HEADER] = str(note_write(client_key(), window))
+        return response
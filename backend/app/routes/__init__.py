@@ -3,11 +3,13 @@ from .adders import adders
 from .getters import getters_bp
 from .changers import changers
 from .payments import payments_bp
+from .metrics import metrics_bp
 
 blueprints = [
     auth_bp,
     adders,
     getters_bp,
     changers,
-    payments_bp
+    payments_bp,
+    metrics_bp
 ]
\ No newline at end of file
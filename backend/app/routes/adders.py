@@ -1,6 +1,6 @@
 from flask import Blueprint, jsonify, request
 from ..extensions import db, jwt
-from ..models import User, Charities, Wishes, Payments
+from ..models import User, Charities, Wishes, Payments, PaymentsArchive
 from flask_jwt_extended import jwt_required
 
 adders = Blueprint('adders', __name__, url_prefix='/adders')
@@ -169,8 +169,9 @@ def edit_charity():
     # 6. Delete or Mark Missing Wishes (Cleanup)
     wishes_to_delete_ids = existing_wish_ids - incoming_wish_ids
     if wishes_to_delete_ids:
-        # Prevent deleting wishes that already have payments associated with them.
-        linked_payment_wish_ids = {r[0] for r in db.session.query(Payments.wish_id).filter(Payments.wish_id.in_(wishes_to_delete_ids)).distinct().all()}
+        # Prevent deleting wishes that already have payments associated with them (hot or archived).
+        linked_payment_wish_ids = {r[0] for model in (Payments, PaymentsArchive)
+                                   for r in db.session.query(model.wish_id).filter(model.wish_id.in_(wishes_to_delete_ids)).distinct().all()}
         if linked_payment_wish_ids:
             return jsonify({'success': False, 'message': f'Cannot delete wishes with existing payments: {sorted(list(linked_payment_wish_ids))}'}), 400
 
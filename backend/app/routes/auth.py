@@ -1,19 +1,44 @@
-from flask import Blueprint, jsonify, request
-from ..extensions import jwt
+from flask import Blueprint, jsonify, request, g
+from ..extensions import db, jwt, limiter
+from ..models import User
+from ..security import hasher, admin_required, LoginBusy
 from flask_jwt_extended import jwt_required, create_access_token, get_jwt_identity, create_refresh_token
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
 @auth_bp.route('/login', methods=['POST'])
+@limiter.limit(5, per=60)
+@limiter.limit(60, per=60, key='route')
 def login():
-    data = request.get_json()
-    username = data.get('username')
-    password = data.get('password')
-    
-    # Dummy user validation for demonstration purposes
-    if username == 'admin' and password == 'password':
-        access_token = create_access_token(identity={'username': username})
-        refresh_token = create_refresh_token(identity={'username': username})
-        return jsonify({'success': True, 'access_token': access_token, 'refresh_token': refresh_token}), 200
-    else:
+    data = request.get_json(silent=True) or {}
+    username = (data.get('username') or '').strip()
+    password = data.get('password') or ''
+    if not username or not password:
         return jsonify({"msg": "Bad username or password"}), 401
+
+    user = User.query.filter_by(username=username).first()
+    try:
+        valid = hasher.verify(user.password_hash if user else None, password)
+    except LoginBusy:
+        return jsonify({"msg": "Too many logins in progress, try again shortly"}), 503
+
+    if not (user and valid):
+        return jsonify({"msg": "Bad username or password"}), 401
+
+    # Upgrade hashes made with an older BCRYPT_LOG_ROUNDS while we have the password
+    if hasher.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = hasher.hash(password)
+            db.session.commit()
+        except LoginBusy:
+            pass
+
+    claims = {'username': user.username}
+    access_token = create_access_token(identity=str(user.id), additional_claims=claims)
+    refresh_token = create_refresh_token(identity=str(user.id), additional_claims=claims)
+    return jsonify({'success': True, 'access_token': access_token, 'refresh_token': refresh_token}), 200
+
+@auth_bp.route('/me', methods=['GET'])
+@admin_required
+def me():
+    return jsonify({'success': True, 'user': g.current_user}), 200
@@ -1,9 +1,16 @@
-from flask import Blueprint, jsonify
+from datetime import datetime
+from flask import Blueprint, Response, current_app, jsonify, request
 from ..extensions import db, jwt
-from ..models import Payments, User, Charities, Wishes
+from ..models import Payments, User, Charities, Wishes, Donors
 from flask_jwt_extended import jwt_required
+from ..replicas import route_reads_to_replicas
+from ..security import admin_required
+from ..archive import payments_select
+from ..catalogue import catalogue
+from ..progress import wish_progress
 
 getters_bp = Blueprint('getters', __name__, url_prefix='/getters')
+route_reads_to_replicas(getters_bp)
 
 @getters_bp.route('/charities', methods=['GET'])
 def get_charities():
@@ -19,6 +26,20 @@ def get_charities():
     } for charity in charities]
     return jsonify({'success': True, 'charities': charities_list}), 200
 
+@getters_bp.route('/catalogue', methods=['GET'])
+def get_catalogue():
+    # Active charities with their open wishes, served from the in-process snapshot
+    max_age = current_app.config.get('CATALOGUE_MAX_AGE', 30)
+    body, etag = catalogue.get(max_age)
+
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = (
+        f"public, max-age={max_age}, s-maxage={max_age}, "
+        f"stale-while-revalidate={current_app.config.get('CATALOGUE_STALE_WHILE_REVALIDATE', 300)}"
+    )
+    return response.make_conditional(request)
+
 @getters_bp.route('/charities-admin', methods=['GET'])
 def get_charities_admin():
     charities = Charities.query.all()
@@ -41,44 +62,128 @@ def get_charities_admin():
 
 @getters_bp.route('/wishes', methods=['GET'])
 def get_wishes():
-    wishes = Wishes.query.all()
-    for wish in wishes:
-        my_charity = Charities.query.filter_by(id=wish.charity_id).first()
-        wish.charity_name = my_charity.name if my_charity else "Unknown Charity"
-        wish.total_prize = wish.unit_price * wish.quantity
-
-    wishes_list = [{
-        'id': wish.id,
-        'name': wish.name,
-        'description': wish.description,
-        'unit_price': wish.unit_price,
-        'quantity': wish.quantity,
-        'current_price': wish.current_price,
-        'total_price': wish.total_prize,
-        'charity_name': wish.charity_name,
-        'fulfilled': wish.fulfilled,
-        'created_at': wish.created_at.isoformat() if getattr(wish, 'created_at', None) else None
-    } for wish in wishes]
-    return jsonify({'success': True, 'wishes': wishes_list}), 200
+    # Served from the in-memory progress snapshot, not the database
+    wish_progress.ensure_fresh(current_app.config.get('WISH_PROGRESS_MAX_AGE', 30))
+    return jsonify({'success': True, 'wishes': wish_progress.wishes()}), 200
+
+@getters_bp.route('/wishes/<int:wish_id>/progress', methods=['GET'])
+def get_wish_progress(wish_id):
+    wish_progress.ensure_fresh(current_app.config.get('WISH_PROGRESS_MAX_AGE', 30))
+    progress = wish_progress.progress(wish_id)
+    if not progress:
+        return jsonify({'success': False, 'message': 'Wish not found'}), 404
+    return jsonify({'success': True, 'progress': progress}), 200
+
+def _date_arg(name):
+    """Parse an optional YYYY-MM-DD query argument; raises ValueError if malformed."""
+    value = request.args.get(name)
+    return datetime.strptime(value, '%Y-%m-%d') if value else None
 
 @getters_bp.route('/payments', methods=['GET'])
 def get_payments():
-    payments = Payments.query.all()
-    payments_list = []
-    for payment in payments:
-        wish = Wishes.query.filter_by(id=payment.wish_id).first()
-        charity = Charities.query.filter_by(id=wish.charity_id).first() if wish else None
-
-        payments_list.append({
-            'id': payment.id,
-            'wish_id': payment.wish_id,
-            'wish_name': wish.name if wish else "Unknown Wish",
-            'charity_name': charity.name if charity else "Unknown Charity",
-            'quantity': payment.quantity,
-            'unit_price': payment.unit_price,
-            'amount': payment.amount,
-            'payment_date': payment.payment_date.isoformat() if getattr(payment, 'payment_date', None) else None,
-            'donor_email': payment.donor_email
-        })
-
-    return jsonify({'success': True, 'payments': payments_list}), 200
\ No newline at end of file
+    # Only the hot table is read unless from/to reach back into archived months
+    # or ?archived=1 asks for every payment
+    try:
+        start, end = _date_arg('from'), _date_arg('to')
+    except ValueError:
+        return jsonify({'success': False, 'message': 'from/to must be dates in YYYY-MM-DD format'}), 400
+    include_archive = True if request.args.get('archived') in ('1', 'true') else None
+
+    payments = payments_select(start, end, include_archive=include_archive).subquery()
+    rows = db.session.query(payments, Wishes.name.label('wish_name'), Charities.name.label('charity_name')) \
+        .outerjoin(Wishes, payments.c.wish_id == Wishes.id) \
+        .outerjoin(Charities, Wishes.charity_id == Charities.id) \
+        .order_by(payments.c.payment_date, payments.c.id).all()
+
+    payments_list = [{
+        'id': payment.id,
+        'wish_id': payment.wish_id,
+        'wish_name': payment.wish_name or "Unknown Wish",
+        'charity_name': payment.charity_name or "Unknown Charity",
+        'quantity': payment.quantity,
+        'unit_price': payment.unit_price,
+        'amount': payment.amount,
+        'payment_date': payment.payment_date.isoformat() if payment.payment_date else None,
+        'donor_email': payment.donor_email,
+        'archived': bool(payment.archived)
+    } for payment in rows]
+
+    return jsonify({'success': True, 'payments': payments_list}), 200
+
+MAX_TOP_DONORS = 100
+MAX_PER_PAGE = 100
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+@getters_bp.route('/donors/top', methods=['GET'])
+@admin_required
+def get_top_donors():
+    limit = request.args.get('limit', 10, type=int)
+    limit = max(1, min(limit, MAX_TOP_DONORS))
+
+    # Reads straight off the donors.total_given index, no scan of payments
+    donors = Donors.query.order_by(Donors.total_given.desc(), Donors.id).limit(limit).all()
+    donors_list = [{
+        'rank': rank,
+        'email': donor.email,
+        'total_given': donor.total_given,
+        'donation_count': donor.donation_count,
+        'charities_supported': donor.charities_supported,
+        'first_donation_at': _iso(donor.first_donation_at),
+        'last_donation_at': _iso(donor.last_donation_at)
+    } for rank, donor in enumerate(donors, start=1)]
+    return jsonify({'success': True, 'donors': donors_list}), 200
+
+@getters_bp.route('/donors/<path:email>/payments', methods=['GET'])
+@admin_required
+def get_donor_history(email):
+    donor = Donors.query.filter_by(email=email).first()
+    if not donor:
+        return jsonify({'success': False, 'message': 'Donor not found'}), 404
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), MAX_PER_PAGE))
+    try:
+        start, end = _date_arg('from'), _date_arg('to')
+    except ValueError:
+        return jsonify({'success': False, 'message': 'from/to must be dates in YYYY-MM-DD format'}), 400
+
+    # Walks the (donor_email, payment_date) indexes of the hot and archive tables, so
+    # the history is complete; wish and charity names come from one join
+    payments = payments_select(start, end, donor_email=email, include_archive=True).subquery()
+    # Count the rows being paged over (from/to narrow them below donation_count)
+    total = db.session.query(db.func.count()).select_from(payments).scalar()
+    rows = db.session.query(payments, Wishes.name.label('wish_name'), Charities.name.label('charity_name')) \
+        .outerjoin(Wishes, payments.c.wish_id == Wishes.id) \
+        .outerjoin(Charities, Wishes.charity_id == Charities.id) \
+        .order_by(payments.c.payment_date.desc(), payments.c.id.desc()) \
+        .offset((page - 1) * per_page).limit(per_page).all()
+
+    payments_list = [{
+        'id': payment.id,
+        'wish_id': payment.wish_id,
+        'wish_name': payment.wish_name or "Unknown Wish",
+        'charity_name': payment.charity_name or "Unknown Charity",
+        'quantity': payment.quantity,
+        'unit_price': payment.unit_price,
+        'amount': payment.amount,
+        'payment_date': _iso(payment.payment_date),
+        'archived': bool(payment.archived)
+    } for payment in rows]
+
+    return jsonify({
+        'success': True,
+        'donor': {
+            'email': donor.email,
+            'total_given': donor.total_given,
+            'donation_count': donor.donation_count,
+            'charities_supported': donor.charities_supported,
+            'first_donation_at': _iso(donor.first_donation_at),
+            'last_donation_at': _iso(donor.last_donation_at)
+        },
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'payments': payments_list
+    }), 200
@@ -0,0 +1,10 @@
+from flask import Blueprint, jsonify
+from ..engine import pool_snapshot
+from ..security import admin_required
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/metrics')
+
+@metrics_bp.route('/db-pool', methods=['GET'])
+@admin_required
+def db_pool():
+    return jsonify({'success': True, 'pool': pool_snapshot()}), 200
@@ -1,18 +1,14 @@
-import os
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-import requests
-from ..models import Payments, Wishes
-from ..extensions import db, jwt
+from ..models import Payments, PaymentReferences, Wishes
+from ..extensions import db, jwt, limiter
+from ..paystack import PAYSTACK_SECRET_KEY, PAYSTACK_INIT_URL, PAYSTACK_CALLBACK_URL, http_session, verify_transaction, parse_transaction
 
 payments_bp = Blueprint('payments', __name__, url_prefix="/payments")
 
-
-PAYSTACK_SECRET_KEY = os.environ.get('PAYSTACK_SECRET_KEY', "sk_test_84af6feb64e3d2a52369d14c6c2e3bff3f3b387a")
-PAYSTACK_INIT_URL = "https://api.paystack.co/transaction/initialize"
-PAYSTACK_VERIFY_URL = "https://api.paystack.co/transaction/verify/"
-
 @payments_bp.route('/api/initialize-payment', methods=['POST'])
+@limiter.limit(10, per=60)
+@limiter.limit(300, per=60, key='route')
 def initialize_payments():
     try:
         data = request.get_json()
@@ -45,7 +41,7 @@ def initialize_payments():
         payload = {
             "email": email,
             "amount": amount_kobo,
-            "callback_url": "https://giving-tree-admin.onrender.com/payments/payment_callback",
+            "callback_url": PAYSTACK_CALLBACK_URL,
             "metadata": {
                 "item_id": item_id,
                 "quantity": quantity,
@@ -65,12 +61,11 @@ def initialize_payments():
             return jsonify({"status": False, "message": "Invalid item ID"}), 400
         else:
             print(f"Found Wish: {wish}")
-            response = requests.post(PAYSTACK_INIT_URL, json=payload, headers=headers)
-            response_data = response.json()
+            from requests import RequestException  # imported lazily to keep worker start-up light
             try:
-                response = requests.post(PAYSTACK_INIT_URL, json=payload, headers=headers, timeout=10)
+                response = http_session().post(PAYSTACK_INIT_URL, json=payload, headers=headers, timeout=10)
                 response_data = response.json()
-            except requests.RequestException as e:
+            except RequestException as e:
                 print(f"Paystack init request failed: {e}")
                 return jsonify({"status": False, "message": f"Payment gateway error: {e}"}), 502
 
@@ -93,60 +88,28 @@ def payment_callback():
     if not reference:
         return "No reference", 400
 
-    # Helper function to safely get integers
-    def safe_int(value, default=0):
-        try:
-            if value is None or value == '':
-                return default
-            return int(value)
-        except (ValueError, TypeError):
-            return default
-
-    # Helper function to safely get floats
-    def safe_float(value, default=0.0):
-        try:
-            if value is None or value == '':
-                return default
-            return float(value)
-        except (ValueError, TypeError):
-            return default
-
     # Verify transaction
-    headers = {"Authorization": f"Bearer {PAYSTACK_SECRET_KEY}"}
-    verify_response = requests.get(f"{PAYSTACK_VERIFY_URL}{reference}", headers=headers)
-    verify_data = verify_response.json()
+    verify_data = verify_transaction(reference)
 
     #print(verify_data)
 
     if verify_data['status'] and verify_data['data']['status'] == 'success':
         # 3. Retrieve the item_id from metadata
         # Note: Paystack returns metadata inside the 'data' object
-        data = verify_data['data']
-        metadata = data.get('metadata') if isinstance(data, dict) else None
-
-        paid_amount = safe_float(data.get('amount')) / 100  # Convert back to Naira
-
-        # Paystack usually returns the payer email under the `customer` object
-        # Try several places so we robustly capture the email
-        paid_email = None
-        if isinstance(data, dict):
-            customer = data.get('customer') or {}
-            paid_email = customer.get('email') if isinstance(customer, dict) else None
-            if not paid_email:
-                paid_email = data.get('email')
-        # As a last resort, check metadata in case client passed email there
-        if not paid_email and isinstance(metadata, dict):
-            paid_email = metadata.get('email')
-
-        if not paid_email:
-            paid_email = "unknown@example.com"  # Fallback email
-        
-        paid_item_id = safe_int(metadata.get('item_id') if isinstance(metadata, dict) else None, default=None) # Keep None if ID is missing
-        paid_quantity = safe_int(metadata.get('quantity') if isinstance(metadata, dict) else None, default=1)
-        paid_unit_price = safe_float(metadata.get('unit_price') if isinstance(metadata, dict) else None, default=0.0)
+        paid = parse_transaction(verify_data['data'])
+        paid_item_id = paid['item_id']
+        paid_quantity = paid['quantity']
+        paid_unit_price = paid['unit_price']
+        paid_amount = paid['amount']
+        paid_email = paid['email']
 
         print(f"Payment Callback Data: item_id={paid_item_id}, quantity={paid_quantity}, unit_price={paid_unit_price}, amount={paid_amount}, email={paid_email}")
 
+        # A reloaded callback page must not record the same charge twice,
+        # even after its payment was archived
+        if PaymentReferences.exists(reference):
+            return f"Success! You paid for Item ID: {paid_item_id}"
+
         # 4. Validate item_id and ensure the referenced wish exists.
         if paid_item_id is None:
             print("Missing item_id in payment metadata; aborting creation of payment record.")
@@ -159,17 +122,13 @@ def payment_callback():
 
         # Create and persist Payment record in a transaction-safe way
         try:
-            payment = Payments(
-                wish_id=paid_item_id,
-                quantity=paid_quantity,
-                unit_price=paid_unit_price,
-                amount=paid_amount,
-                donor_email=paid_email
-            )
-            db.session.add(payment)
+            Payments.record(wish_obj, paid_quantity, paid_unit_price, paid_amount, paid_email, reference=reference)
             db.session.commit()
         except Exception as e:
             db.session.rollback()
+            if PaymentReferences.exists(reference):
+                # A concurrent callback for the same charge recorded it first
+                return f"Success! You paid for Item ID: {paid_item_id}"
             print(f"Failed to create payment record: {e}")
             return "Server error creating payment record", 500
 
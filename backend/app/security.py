@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import wraps
+
+import click
+from flask import current_app, g, jsonify, request
+from flask.cli import with_appcontext
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+
+from .extensions import db, bcrypt
+from .models import User
+
+
+class LoginBusy(Exception):
+    """Raised when too many password checks are already queued, or one timed out."""
+
+
+class PasswordHasher:
+    """Runs bcrypt in a small fixed pool so its CPU cost is capped per worker.
+
+    Request threads wait on the result, but at most `max_threads` hashes run at once
+    and at most `max_queue` more may wait; beyond that logins are turned away
+    instead of stacking up behind each other.
+    """
+
+    def __init__(self):
+        self._pool = None
+        self._slots = None
+        self._dummy_hash = None
+        self.timeout = 5
+
+    def init_app(self, app):
+        max_threads = app.config.get('BCRYPT_MAX_THREADS', 2)
+        self._pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_threads + app.config.get('BCRYPT_MAX_QUEUE', 8))
+        self.timeout = app.config.get('BCRYPT_TIMEOUT', 5)
+        self._dummy_hash = None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise LoginBusy()
+        try:
+            future = self._pool.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the hash itself finishes, not just until this
+        # request stops waiting, so max_queue really caps the pending work
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise LoginBusy()
+
+    def hash(self, password):
+        return self._run(bcrypt.generate_password_hash, password).decode('utf-8')
+
+    def verify(self, password_hash, password):
+        if not password_hash:
+            # Unknown username: still pay for one check so both paths take the same time
+            if self._dummy_hash is None:
+                self._dummy_hash = self.hash('not-a-real-password')
+            password_hash = self._dummy_hash
+        return self._run(bcrypt.check_password_hash, password_hash, password)
+
+    @staticmethod
+    def needs_rehash(password_hash):
+        """True when the stored hash was made with a different cost factor."""
+        try:
+            return int(password_hash.split('$')[2]) != current_app.config['BCRYPT_LOG_ROUNDS']
+        except (IndexError, ValueError):
+            return True
+
+
+class IdentityCache:
+    """Short-lived map of raw access token -> user identity for admin routes."""
+
+    def __init__(self, maxsize=1024):
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+
+    def get(self, token):
+        with self._lock:
+            item = self._items.get(token)
+            if item is None:
+                return None
+            expires_at, identity = item
+            if expires_at <= time.time():
+                del self._items[token]
+                return None
+            self._items.move_to_end(token)
+            return identity
+
+    def set(self, token, identity, expires_at):
+        with self._lock:
+            self._items[token] = (expires_at, identity)
+            self._items.move_to_end(token)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+hasher = PasswordHasher()
+identity_cache = IdentityCache()
+
+
+def _bearer_token():
+    header = request.headers.get('Authorization', '')
+    return header[7:] if header.startswith('Bearer ') else None
+
+
+def admin_required(view):
+    """Like @jwt_required(), but skips decoding the token and loading the user
+    again while the identity for that exact token sits in the cache.
+
+    The user row is loaded once per token per JWT_IDENTITY_CACHE_TTL, so a
+    deleted user keeps access for at most that long.
+    """
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        token = _bearer_token()
+        identity = identity_cache.get(token) if token else None
+        if identity is None:
+            verify_jwt_in_request()
+            user = db.session.get(User, int(get_jwt_identity()))
+            if not user:
+                return jsonify({'success': False, 'message': 'User no longer exists'}), 401
+            identity = {'id': user.id, 'username': user.username, 'email': user.email}
+            ttl = current_app.config.get('JWT_IDENTITY_CACHE_TTL', 60)
+            identity_cache.set(token, identity, min(time.time() + ttl, get_jwt()['exp']))
+        g.current_user = identity
+        return view(*args, **kwargs)
+    return wrapped
+
+
+@click.command('create-admin')
+@click.argument('username')
+@click.argument('email')
+@click.password_option()
+@with_appcontext
+def create_admin(username, email, password):
+    """Create an admin user (or reset the password of an existing one)."""
+    user = User.query.filter_by(username=username).first()
+    password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+    if user:
+        user.password_hash = password_hash
+        user.email = email
+    else:
+        db.session.add(User(username=username, email=email, password_hash=password_hash))
+    db.session.commit()
+    click.echo(f"Admin {username} saved")
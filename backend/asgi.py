@@ -0,0 +1,15 @@
+"""ASGI entry point. The payments routes run natively async; everything else is the
+regular Flask app behind a WSGI adapter.
+
+    uvicorn asgi:app --workers 2
+"""
+import os
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import create_app, warm_caches
+from app.async_payments import AsyncPayments
+
+flask_app = create_app(os.environ.get('FLASK_CONFIG', 'production'))
+warm_caches(flask_app)
+app = AsyncPayments(flask_app, WsgiToAsgi(flask_app))
@@ -0,0 +1,46 @@
+"""Pick BCRYPT_LOG_ROUNDS: time one password check per cost factor on this machine.
+
+The recommendation is the highest cost whose check fits the per-login budget
+(default 250 ms), which is what one login holds a hashing thread for.
+
+    python benchmarks/bench_bcrypt.py --budget-ms 250
+"""
+import argparse
+import time
+
+import bcrypt
+
+
+def check_ms(rounds, samples):
+    hashed = bcrypt.hashpw(b'correct horse battery staple', bcrypt.gensalt(rounds))
+    best = float('inf')
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.checkpw(b'correct horse battery staple', hashed)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=250)
+    parser.add_argument('--min-rounds', type=int, default=10)
+    parser.add_argument('--max-rounds', type=int, default=14)
+    parser.add_argument('--samples', type=int, default=3)
+    args = parser.parse_args()
+
+    chosen = args.min_rounds
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        ms = check_ms(rounds, args.samples)
+        fits = ms <= args.budget_ms
+        if fits:
+            chosen = rounds
+        print(f'rounds {rounds:2d}: {ms:8.1f} ms/check  {1000 / ms:6.1f} logins/s per thread  '
+              f'{"ok" if fits else "over budget"}')
+        if not fits:
+            break
+    print(f'\nBCRYPT_LOG_ROUNDS={chosen}')
+
+
+if __name__ == '__main__':
+    main()
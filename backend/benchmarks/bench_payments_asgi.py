@@ -0,0 +1,135 @@
+"""Throughput of initialize-payment: sync gunicorn (run:app) vs the ASGI entry point (asgi:app).
+
+Both deployments get the same worker count and talk to paystack_stub.py with injected
+latency, so the number that matters is how many gateway calls a worker can keep in flight.
+
+    python benchmarks/bench_payments_asgi.py --workers 2 --latency 0.2 --requests 400 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+STUB_PORT = 5055
+APP_PORT = 5056
+
+
+def seed_database(path):
+    os.environ['DEV_DATABASE_URL'] = f'sqlite:///{path}'
+    from app import create_app
+    from app.extensions import db
+    from app.models import Charities, Wishes
+
+    app = create_app('development')
+    with app.app_context():
+        db.create_all()
+        charity = Charities(name='Bench Charity', description='-', website='-', image_url='-', active=True)
+        db.session.add(charity)
+        db.session.flush()
+        wish = Wishes(charity_id=charity.id, name='Bench Wish', description='-', unit_price=1000.0,
+                      quantity=1000, total_price=1000000.0)
+        db.session.add(wish)
+        db.session.commit()
+        return wish.id
+
+
+def wait_for(url, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f'{url} did not come up')
+
+
+async def load(url, body, total, concurrency):
+    latencies = []
+    failures = 0
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker(client):
+        nonlocal failures
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, json=body)
+                if response.status_code != 200:
+                    failures += 1
+            except httpx.HTTPError:
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return elapsed, latencies, failures
+
+
+def run_case(name, command, env, args, body):
+    server = subprocess.Popen(command, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(f'http://127.0.0.1:{APP_PORT}/metrics/db-pool')
+        url = f'http://127.0.0.1:{APP_PORT}/payments/api/initialize-payment'
+        elapsed, latencies, failures = asyncio.run(load(url, body, args.requests, args.concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f'{name:<8} {args.requests / elapsed:8.1f} req/s  p50 {statistics.median(latencies) * 1000:7.1f} ms  '
+          f'p95 {p95 * 1000:7.1f} ms  failures {failures}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.2, help='Injected gateway latency in seconds.')
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+    wish_id = seed_database(db_path)
+    body = {'email': 'bench@example.com', 'quantity': 1, 'unit_price': 1000, 'amount': 1000, 'id': wish_id}
+
+    env = dict(os.environ,
+               DEV_DATABASE_URL=f'sqlite:///{db_path}',
+               FLASK_CONFIG='development',
+               RATELIMIT_ENABLED='0',
+               PAYSTACK_BASE_URL=f'http://127.0.0.1:{STUB_PORT}',
+               PAYSTACK_STUB_LATENCY=str(args.latency),
+               PAYSTACK_STUB_PORT=str(STUB_PORT))
+    stub = subprocess.Popen([sys.executable, 'paystack_stub.py'], cwd=BACKEND, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(f'http://127.0.0.1:{STUB_PORT}/transaction')
+        print(f'{args.requests} requests, concurrency {args.concurrency}, {args.workers} workers, '
+              f'gateway latency {args.latency * 1000:.0f} ms')
+        run_case('sync', ['gunicorn', '-w', str(args.workers), '-b', f'127.0.0.1:{APP_PORT}', 'run:app'],
+                 env, args, body)
+        run_case('asgi', ['uvicorn', 'asgi:app', '--workers', str(args.workers), '--port', str(APP_PORT),
+                          '--log-level', 'warning'], env, args, body)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == '__main__':
+    main()
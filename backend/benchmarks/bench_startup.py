@@ -0,0 +1,65 @@
+"""Worker boot cost: create_app() wall time and an import-time breakdown.
+
+Every sample runs in a fresh interpreter, like a new gunicorn worker without --preload.
+
+    python benchmarks/bench_startup.py --runs 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMED = (
+    "import time; t = time.perf_counter(); "
+    "from app import create_app; create_app({config!r}); "
+    "print(time.perf_counter() - t)"
+)
+
+
+def create_app_seconds(config_name, env):
+    out = subprocess.run([sys.executable, '-c', TIMED.format(config=config_name)],
+                         cwd=BACKEND, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def import_breakdown(config_name, env):
+    """(cumulative_us, module) for every module imported while building the app."""
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                          f"from app import create_app; create_app({config_name!r})"],
+                         cwd=BACKEND, env=env, capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, module = line.split('|')
+        # One space follows the bar; deeper nesting adds two per level
+        rows.append((int(cumulative_us), module[1:].rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--config', default='development')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='0')
+    create_app_seconds(args.config, env)  # warm the bytecode cache
+    samples = [create_app_seconds(args.config, env) for _ in range(args.runs)]
+    print(f'create_app({args.config!r}): median {statistics.median(samples) * 1000:.0f} ms, '
+          f'min {min(samples) * 1000:.0f} ms over {args.runs} runs\n')
+
+    rows = import_breakdown(args.config, env)
+    # Top-level imports and what they pulled in directly (e.g. app -> flask_migrate)
+    shallow = [(us, m) for us, m in rows if len(m) - len(m.lstrip()) <= 2]
+    print(f'{"cumulative ms":>14}  import')
+    for us, module in sorted(shallow, reverse=True)[:args.top]:
+        print(f'{us / 1000:14.1f}  {module}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""gunicorn settings. The app is imported once in the master (preload_app) and
+forked, so workers share its memory pages and boot without re-importing.
+
+DB_POOL_PROFILE follows GUNICORN_THREADS unless set (see pool_profile in app/config.py).
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = True
+accesslog = '-'
+
+
+def when_ready(server):
+    # Move everything imported so far out of the GC's reach so collections in the
+    # workers don't touch (and copy) the shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Connections must never cross a fork; each worker opens its own on first use
+    from app import warm_caches
+    from app.extensions import db
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    # Per-worker caches are filled here, after the fork, so each worker owns its copy
+    warm_caches(app)
@@ -0,0 +1,35 @@
+"""payment references
+
+Revision ID: 7d4f2a9c1e63
+Revises: e5d902b7c318
+Create Date: 2026-10-19 16:40:27.113052
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4f2a9c1e63'
+down_revision = 'e5d902b7c318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('payment_references',
+    sa.Column('reference', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('reference')
+    )
+
+    # Backfill from hot and archived payments; UNION drops references present in both
+    op.execute("""
+        INSERT INTO payment_references (reference)
+        SELECT reference FROM payments WHERE reference IS NOT NULL
+        UNION
+        SELECT reference FROM payments_archive WHERE reference IS NOT NULL
+    """)
+
+
+def downgrade():
+    op.drop_table('payment_references')
@@ -0,0 +1,43 @@
+"""payments autoincrement
+
+Revision ID: 9b1c6e4d8a25
+Revises: 7d4f2a9c1e63
+Create Date: 2026-10-19 17:12:50.428716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1c6e4d8a25'
+down_revision = '7d4f2a9c1e63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # PostgreSQL sequences never hand out an id twice; only SQLite needs this
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    with op.batch_alter_table('payments', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+
+    # Start past every id already used, including those of archived payments
+    op.execute("DELETE FROM sqlite_sequence WHERE name IN ('payments', '_alembic_tmp_payments')")
+    op.execute("""
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT 'payments', COALESCE(MAX(id), 0)
+        FROM (SELECT id FROM payments UNION ALL SELECT id FROM payments_archive)
+    """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    with op.batch_alter_table('payments', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        pass
@@ -0,0 +1,68 @@
+"""donor aggregates
+
+Revision ID: a41c7d2e9b10
+Revises: 6b0377234e0f
+Create Date: 2026-10-19 10:12:41.502318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c7d2e9b10'
+down_revision = '6b0377234e0f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('donors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=150), nullable=False),
+    sa.Column('total_given', sa.Float(), nullable=False),
+    sa.Column('donation_count', sa.Integer(), nullable=False),
+    sa.Column('charities_supported', sa.Integer(), nullable=False),
+    sa.Column('first_donation_at', sa.DateTime(), nullable=True),
+    sa.Column('last_donation_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    with op.batch_alter_table('donors', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_donors_total_given'), ['total_given'], unique=False)
+
+    op.create_table('donor_charities',
+    sa.Column('donor_email', sa.String(length=150), nullable=False),
+    sa.Column('charity_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['charity_id'], ['charities.id'], ),
+    sa.ForeignKeyConstraint(['donor_email'], ['donors.email'], ),
+    sa.PrimaryKeyConstraint('donor_email', 'charity_id')
+    )
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('ix_payments_donor_email_payment_date', ['donor_email', 'payment_date'], unique=False)
+
+    # Backfill aggregates from the payments already on record
+    op.execute("""
+        INSERT INTO donors (email, total_given, donation_count, charities_supported, first_donation_at, last_donation_at)
+        SELECT p.donor_email, SUM(p.amount), COUNT(*), COUNT(DISTINCT w.charity_id), MIN(p.payment_date), MAX(p.payment_date)
+        FROM payments p LEFT JOIN wishes w ON w.id = p.wish_id
+        WHERE p.donor_email IS NOT NULL AND p.donor_email <> 'unknown@example.com'
+        GROUP BY p.donor_email
+    """)
+    op.execute("""
+        INSERT INTO donor_charities (donor_email, charity_id)
+        SELECT DISTINCT p.donor_email, w.charity_id
+        FROM payments p JOIN wishes w ON w.id = p.wish_id
+        WHERE p.donor_email IS NOT NULL AND p.donor_email <> 'unknown@example.com'
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_index('ix_payments_donor_email_payment_date')
+
+    op.drop_table('donor_charities')
+    with op.batch_alter_table('donors', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_donors_total_given'))
+
+    op.drop_table('donors')
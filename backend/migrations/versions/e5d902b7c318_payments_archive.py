@@ -0,0 +1,63 @@
+"""payments archive
+
+Revision ID: e5d902b7c318
+Revises: c83f5e1a2d47
+Create Date: 2026-10-19 14:21:09.618440
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5d902b7c318'
+down_revision = 'c83f5e1a2d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('ix_payments_payment_date', ['payment_date'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Monthly partitions are created by `flask archive-payments` as months are closed
+        op.execute("""
+            CREATE TABLE payments_archive (
+                id INTEGER NOT NULL,
+                payment_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                wish_id INTEGER NOT NULL REFERENCES wishes (id),
+                quantity INTEGER NOT NULL,
+                unit_price DOUBLE PRECISION NOT NULL,
+                amount DOUBLE PRECISION NOT NULL,
+                donor_email VARCHAR(150),
+                reference VARCHAR(100),
+                PRIMARY KEY (id, payment_date)
+            ) PARTITION BY RANGE (payment_date)
+        """)
+    else:
+        op.create_table('payments_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('payment_date', sa.DateTime(), nullable=False),
+        sa.Column('wish_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Float(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('donor_email', sa.String(length=150), nullable=True),
+        sa.Column('reference', sa.String(length=100), nullable=True),
+        sa.ForeignKeyConstraint(['wish_id'], ['wishes.id'], ),
+        sa.PrimaryKeyConstraint('id', 'payment_date')
+        )
+
+    op.create_index('ix_payments_archive_payment_date', 'payments_archive', ['payment_date'], unique=False)
+    op.create_index('ix_payments_archive_donor_email_payment_date', 'payments_archive',
+                    ['donor_email', 'payment_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_payments_archive_donor_email_payment_date', table_name='payments_archive')
+    op.drop_index('ix_payments_archive_payment_date', table_name='payments_archive')
+    op.drop_table('payments_archive')
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_index('ix_payments_payment_date')
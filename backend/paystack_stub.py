@@ -0,0 +1,92 @@
+"""Local stand-in for the parts of the Paystack API we call.
+
+Run it and point the app at it:
+
+    python paystack_stub.py
+    PAYSTACK_BASE_URL=http://127.0.0.1:5055 flask --app run.py reconcile-payments --from 2025-12-01
+
+Transactions live in memory. Seed them from a JSON list with PAYSTACK_STUB_DATA=path.json;
+PAYSTACK_STUB_LATENCY (seconds) delays every response to mimic a slow gateway.
+"""
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+
+from flask import Flask, jsonify, request
+
+app = Flask(__name__)
+
+LATENCY = float(os.environ.get('PAYSTACK_STUB_LATENCY', 0))
+TRANSACTIONS = {}
+
+if os.environ.get('PAYSTACK_STUB_DATA'):
+    with open(os.environ['PAYSTACK_STUB_DATA']) as f:
+        for txn in json.load(f):
+            TRANSACTIONS[txn['reference']] = txn
+
+
+def _parse(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+@app.before_request
+def simulate_latency():
+    if LATENCY:
+        time.sleep(LATENCY)
+
+
+@app.route('/transaction/initialize', methods=['POST'])
+def initialize():
+    data = request.get_json() or {}
+    reference = uuid.uuid4().hex[:12]
+    # Charges complete immediately; the callback is what may or may not happen
+    TRANSACTIONS[reference] = {
+        'id': len(TRANSACTIONS) + 1,
+        'reference': reference,
+        'status': 'success',
+        'amount': data.get('amount'),
+        'paid_at': datetime.utcnow().isoformat() + 'Z',
+        'customer': {'email': data.get('email')},
+        'metadata': data.get('metadata') or {}
+    }
+    return jsonify({'status': True, 'data': {
+        'authorization_url': f"{data.get('callback_url')}?reference={reference}",
+        'reference': reference
+    }})
+
+
+@app.route('/transaction/verify/<reference>', methods=['GET'])
+def verify(reference):
+    txn = TRANSACTIONS.get(reference)
+    if not txn:
+        return jsonify({'status': False, 'message': 'Transaction reference not found'}), 400
+    return jsonify({'status': True, 'data': txn})
+
+
+@app.route('/transaction', methods=['GET'])
+def list_transactions():
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('perPage', 50, type=int)
+    status = request.args.get('status')
+    start = request.args.get('from')
+    end = request.args.get('to')
+
+    txns = sorted(TRANSACTIONS.values(), key=lambda t: t['paid_at'])
+    if status:
+        txns = [t for t in txns if t['status'] == status]
+    if start:
+        txns = [t for t in txns if _parse(t['paid_at']) >= _parse(start)]
+    if end:
+        txns = [t for t in txns if _parse(t['paid_at']) <= _parse(end)]
+
+    page_count = (len(txns) + per_page - 1) // per_page
+    chunk = txns[(page - 1) * per_page:page * per_page]
+    return jsonify({'status': True, 'data': chunk, 'meta': {
+        'total': len(txns), 'page': page, 'perPage': per_page, 'pageCount': page_count
+    }})
+
+
+if __name__ == '__main__':
+    app.run(port=int(os.environ.get('PAYSTACK_STUB_PORT', 5055)), threaded=True)
@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+import pytest
+
+# Config classes read the environment at import time
+os.environ['DEV_DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.sqlite')}"
+os.environ.pop('REPLICA_DATABASE_URLS', None)
+os.environ['RATELIMIT_ENABLED'] = '0'
+
+from app import create_app  # noqa: E402
+from app.catalogue import catalogue  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.progress import wish_progress  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = create_app('development')
+    with app.app_context():
+        db.create_all()
+        # Per-worker caches outlive the app; start every test from the fresh database
+        catalogue.invalidate()
+        wish_progress.invalidate()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.archive import archive_payments
+from app.extensions import db
+from app.models import Charities, Payments, User, Wishes
+
+
+@pytest.fixture
+def payments(app):
+    """One payment in January 2025 (archived) and one in March 2025 (hot), same donor."""
+    charity = Charities(name='Charity', active=True)
+    db.session.add(charity)
+    db.session.flush()
+    wish = Wishes(charity_id=charity.id, name='Wish', unit_price=100.0, quantity=10,
+                  total_price=1000.0, current_price=0.0)
+    db.session.add(wish)
+    db.session.commit()
+    for reference, paid_at in (('ref-jan', datetime(2025, 1, 15)), ('ref-mar', datetime(2025, 3, 15))):
+        Payments.record(wish, 1, 100.0, 100.0, 'donor@example.com', reference=reference, paid_at=paid_at)
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(archive_payments, ['--before', '2025-02'])
+    assert 'archived 1 payments' in result.output
+    return wish
+
+
+def references(response):
+    return sorted(p['payment_date'][:7] for p in response.json['payments'])
+
+
+def test_listing_without_range_reads_only_hot_payments(app, payments):
+    assert references(app.test_client().get('/getters/payments')) == ['2025-03']
+
+
+def test_upper_bound_alone_reaches_archived_months(app, payments):
+    response = app.test_client().get('/getters/payments?to=2025-02-01')
+    assert references(response) == ['2025-01']
+    assert response.json['payments'][0]['archived'] is True
+
+
+def test_archived_flag_lists_every_payment(app, payments):
+    assert references(app.test_client().get('/getters/payments?archived=1')) == ['2025-01', '2025-03']
+
+
+def test_donor_history_includes_archive_and_counts_listed_rows(app, payments):
+    user = User(username='admin', email='admin@example.com', password_hash='-')
+    db.session.add(user)
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+    client = app.test_client()
+
+    response = client.get('/getters/donors/donor@example.com/payments', headers=headers)
+    assert response.json['total'] == 2
+    assert references(response) == ['2025-01', '2025-03']
+
+    response = client.get('/getters/donors/donor@example.com/payments?from=2025-03-01', headers=headers)
+    assert response.json['total'] == 1
+    assert references(response) == ['2025-03']
@@ -0,0 +1,17 @@
+from app.extensions import db
+from app.models import Charities, Wishes
+
+
+def test_catalogue_total_price_matches_wishes_listing(app):
+    charity = Charities(name='Charity', active=True)
+    db.session.add(charity)
+    db.session.flush()
+    # As edit-charity stores it when the admin app sends no total_price
+    db.session.add(Wishes(charity_id=charity.id, name='Wish', unit_price=2.5, quantity=2, total_price=0.0))
+    db.session.commit()
+    client = app.test_client()
+
+    listed = client.get('/getters/wishes').json['wishes'][0]
+    catalogued = client.get('/getters/catalogue').json['charities'][0]['wishes'][0]
+
+    assert listed['total_price'] == catalogued['total_price'] == 5.0
@@ -0,0 +1,40 @@
+import pytest
+
+from app.ratelimit import MemoryStore, RedisStore, forwarded_for
+
+
+@pytest.fixture(params=['memory', 'fakeredis'])
+def store(request):
+    if request.param == 'memory':
+        return MemoryStore()
+    pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    return RedisStore('fakeredis://')
+
+
+def test_take_allows_up_to_capacity_then_waits(store):
+    bucket = [('login:1.1.1.1', 1.0, 2)]
+    assert store.take(bucket, now=100.0) == 0
+    assert store.take(bucket, now=100.0) == 0
+    assert store.take(bucket, now=100.0) == pytest.approx(1.0)
+    # One token back after a second at 1 token/s
+    assert store.take(bucket, now=101.0) == 0
+
+
+def test_refused_request_charges_no_bucket(store):
+    ip_bucket = ('login:1.1.1.1', 1 / 60, 1)
+    route_bucket = ('login', 1 / 60, 5)
+    assert store.take([ip_bucket, route_bucket], now=100.0) == 0
+    for _ in range(10):
+        assert store.take([ip_bucket, route_bucket], now=100.0) > 0
+    # The route bucket lost only the one allowed request's token
+    for i in range(4):
+        assert store.take([(f'login:2.2.2.{i}', 1 / 60, 1), route_bucket], now=100.0) == 0
+    assert store.take([('login:3.3.3.3', 1 / 60, 1), route_bucket], now=100.0) > 0
+
+
+def test_forwarded_for_takes_the_entry_added_by_trusted_proxies():
+    assert forwarded_for('6.6.6.6, 1.2.3.4', 1) == '1.2.3.4'
+    assert forwarded_for('6.6.6.6, 1.2.3.4, 10.0.0.1', 2) == '1.2.3.4'
+    assert forwarded_for('1.2.3.4', 2) is None
+    assert forwarded_for('1.2.3.4', 0) is None
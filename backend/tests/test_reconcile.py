@@ -0,0 +1,112 @@
+from datetime import datetime
+
+import pytest
+
+from app import reconcile
+from app.extensions import db
+from app.models import Charities, Payments, PaymentReferences, Wishes
+
+
+class FakeGateway:
+    """Successful charges, listed the way Paystack filters them: by paid_at within [from, to]."""
+
+    def __init__(self, *transactions):
+        self.transactions = {t['reference']: t for t in transactions}
+
+    def pages(self, start, end, per_page=100):
+        listed = [t for t in self.transactions.values()
+                  if start <= reconcile._parse_paid_at(t['paid_at']) <= end]
+        if listed:
+            yield listed
+
+    def verify(self, reference):
+        return {'status': True, 'data': dict(self.transactions[reference], status='success')}
+
+
+def charge(reference, paid_at, wish_id, amount=100.0, email='donor@example.com'):
+    return {'reference': reference, 'paid_at': paid_at, 'amount': int(amount * 100),
+            'customer': {'email': email}, 'metadata': {'item_id': wish_id, 'quantity': 1}}
+
+
+@pytest.fixture
+def wish(app):
+    charity = Charities(name='Charity', active=True)
+    db.session.add(charity)
+    db.session.flush()
+    wish = Wishes(charity_id=charity.id, name='Wish', unit_price=100.0, quantity=10,
+                  total_price=1000.0, current_price=0.0)
+    db.session.add(wish)
+    db.session.commit()
+    return wish
+
+
+def legacy_payment(wish, paid_at, amount=100.0, email='donor@example.com'):
+    payment = Payments(wish_id=wish.id, quantity=1, unit_price=amount, amount=amount,
+                       donor_email=email, payment_date=paid_at)
+    db.session.add(payment)
+    db.session.commit()
+    return payment
+
+
+def run(app, monkeypatch, gateway, *args):
+    monkeypatch.setattr(reconcile, 'iter_transaction_pages', gateway.pages)
+    monkeypatch.setattr(reconcile, 'verify_transaction', gateway.verify)
+    result = app.test_cli_runner().invoke(reconcile.reconcile_payments, list(args))
+    assert result.exception is None, result.output
+    return result.output
+
+
+def test_legacy_row_in_padding_is_not_reported(app, monkeypatch, wish):
+    # Its charge is real but lies before the window, so the gateway doesn't list it
+    legacy_payment(wish, datetime(2026, 10, 9, 20, 0))
+    gateway = FakeGateway(charge('ref-early', '2026-10-09T20:00:00Z', wish.id))
+
+    output = run(app, monkeypatch, gateway, '--from', '2026-10-10', '--to', '2026-10-11')
+
+    assert 'Recorded without a matching charge (possible duplicates): 0' in output
+
+
+def test_legacy_row_across_window_edge_is_claimed(app, monkeypatch, wish):
+    # Database clock an hour behind the gateway's UTC paid_at
+    payment = legacy_payment(wish, datetime(2026, 10, 9, 23, 30))
+    gateway = FakeGateway(charge('ref-edge', '2026-10-10T00:30:00Z', wish.id))
+
+    output = run(app, monkeypatch, gateway, '--from', '2026-10-10', '--to', '2026-10-11', '--repair')
+
+    assert 'Matched: 1 (references backfilled: 1)' in output
+    assert 'Charged but not recorded: 0' in output
+    assert db.session.get(Payments, payment.id).reference == 'ref-edge'
+    assert Payments.query.count() == 1
+
+
+def test_unclaimed_legacy_row_in_window_is_reported(app, monkeypatch, wish):
+    payment = legacy_payment(wish, datetime(2026, 10, 10, 12, 0))
+
+    output = run(app, monkeypatch, FakeGateway(), '--from', '2026-10-10', '--to', '2026-10-11')
+
+    assert 'possible duplicates): 1' in output
+    assert f'  - payment {payment.id}' in output
+
+
+def test_claim_prefers_the_closest_legacy_row(app, monkeypatch, wish):
+    # Same donor, amount and wish on both days; each charge must take its own row
+    first = legacy_payment(wish, datetime(2026, 10, 9, 22, 0))
+    second = legacy_payment(wish, datetime(2026, 10, 10, 22, 0))
+    gateway = FakeGateway(charge('ref-second', '2026-10-10T22:00:00Z', wish.id))
+
+    output = run(app, monkeypatch, gateway, '--from', '2026-10-10', '--to', '2026-10-11', '--repair')
+
+    assert 'possible duplicates): 0' in output
+    assert db.session.get(Payments, second.id).reference == 'ref-second'
+    assert db.session.get(Payments, first.id).reference is None
+
+
+def test_repair_skips_charges_matching_a_legacy_row_outside_the_padding(app, monkeypatch, wish):
+    legacy_payment(wish, datetime(2026, 10, 1, 9, 0))
+    gateway = FakeGateway(charge('ref-late', '2026-10-10T09:00:00Z', wish.id))
+
+    output = run(app, monkeypatch, gateway, '--from', '2026-10-10', '--to', '2026-10-11', '--repair')
+
+    assert 'repaired: 0' in output
+    assert Payments.query.count() == 1
+    assert db.session.get(PaymentReferences, 'ref-late') is None
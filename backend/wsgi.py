@@ -0,0 +1,9 @@
+"""WSGI entry point for gunicorn; settings live in gunicorn.conf.py.
+
+    gunicorn wsgi:app
+"""
+import os
+
+from app import create_app
+
+app = create_app(os.environ.get('FLASK_CONFIG', 'production'))